@@ -1,4 +1,7 @@
-from ..common import sliding_window
+import functools
+import re
+from collections import namedtuple
+
 from . import hd44780_a00, hd44780_a02, st7066_0b
 
 
@@ -7,33 +10,113 @@ from . import hd44780_a00, hd44780_a02, st7066_0b
 CR = -1
 LF = -2
 
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
 
-class FoundMultiCharMapping(Exception):
+class TranslationTable(dict):
     """
-    Exception to escape nested loops.
+    Table for ``str.translate`` that maps code points to the encoded bytes,
+    and all other code points to the replacement character.
     """
 
-    pass
+    def __init__(self, encoding_table, replacement_char):
+        super(TranslationTable, self).__init__(
+            (ord(char), value) for char, value in encoding_table.items()
+        )
+        self.replacement_char = replacement_char
+
+    def __missing__(self, key):
+        return self.replacement_char
+
+
+def compile_trie(combined_chars):
+    """
+    Compile the combined character mappings into a trie of nested dicts,
+    keyed by character. The encoded value of a sequence is stored under the
+    key ``None`` of the node of its last character.
+    """
+    trie = {}
+    for char, mappings in combined_chars.items():
+        for sequence, value in mappings:
+            node = trie.setdefault(char, {})
+            for next_char in sequence:
+                node = node.setdefault(next_char, {})
+            # If a sequence is mapped twice, the first mapping wins
+            node.setdefault(None, value)
+    return trie
 
 
 class Codec(object):
-    def __init__(self, codec):
+    def __init__(self, codec, cache_size=0):
         assert hasattr(codec, 'replacement_char')
         assert hasattr(codec, 'encoding_table')
-        assert hasattr(codec, 'combined_chars_lookahead')
         assert hasattr(codec, 'combined_chars')
         self.codec = codec
 
+        # Compile the encoding table, so that text without newlines or
+        # combined characters can be encoded in a single pass
+        self._translation = TranslationTable(codec.encoding_table, codec.replacement_char)
+        self._trie = compile_trie(codec.combined_chars)
+        self._special = re.compile('[%s]' % re.escape(''.join(['\r', '\n'] + list(self._trie))))
+
+        # Optional cache of encoded strings
+        self.cache_size = cache_size
+
+    def _get_cache_size(self):
+        return self._cache_size
+
+    def _set_cache_size(self, value):
+        if value < 0:
+            raise ValueError('cache_size must not be negative; got {}'.format(value))
+        self._cache_size = value
+        if value:
+            self._cached_encode = functools.lru_cache(maxsize=value)(self._encode_tuple)
+        else:
+            self._cached_encode = None
+
+    cache_size = property(
+        _get_cache_size,
+        _set_cache_size,
+        doc='The maximum number of encoded strings to cache. ``0`` disables the cache.',
+    )
+
+    def cache_info(self):
+        """Return the hits, misses, maximum and current size of the encode
+        cache as a ``CacheInfo`` tuple."""
+        if self._cached_encode is None:
+            return CacheInfo(0, 0, 0, 0)
+        return CacheInfo(*self._cached_encode.cache_info())
+
+    def cache_clear(self):
+        """Clear the encode cache and its statistics."""
+        if self._cached_encode is not None:
+            self._cached_encode.cache_clear()
+
     def encode(self, input_):  # type: (str) -> List[int]
+        """
+        Encode the string to a list of bytes for the character map, with
+        ``CR`` and ``LF`` for carriage returns and line feeds. The list is a
+        new one on every call, also when the result comes from the cache.
+        """
+        if self._cached_encode is not None:
+            return list(self._cached_encode(input_))
+        return self._encode(input_)
+
+    def _encode_tuple(self, input_):
+        # The cache keeps an immutable copy, so that callers can't change it
+        return tuple(self._encode(input_))
+
+    def _encode(self, input_):  # type: (str) -> List[int]
+        if self._special.search(input_) is None:
+            return list(input_.translate(self._translation).encode('latin-1'))
+
         result = []
-        window_iter = sliding_window(input_, self.codec.combined_chars_lookahead)
-        while True:
-            try:
-                window = next(window_iter)
-            except StopIteration:
-                break
-            char = window[0]
-            lookahead = window[1:]
+        encoding_table = self.codec.encoding_table
+        replacement_char = self.codec.replacement_char
+        i = 0
+        while i < len(input_):
+            char = input_[i]
+            i += 1
 
             # First, test for newlines and carriage returns
             if char == '\r':
@@ -43,38 +126,39 @@ class Codec(object):
                 result.append(LF)
                 continue
 
-            # Then, test whether the character starts a multi-char mapping
-            try:
-                if char in self.codec.combined_chars:
-                    mappings = self.codec.combined_chars[char]
-                    for mapping in mappings:
-                        length = len(mapping[0])
-                        if mapping[0] == ''.join(lookahead[:length]):
-                            # We got a match! Add the mapping...
-                            result.append(mapping[1])
-                            # ...and advance iterator to consume the used up lookahead.
-                            for _ in range(length):
-                                next(window_iter)
-                            raise FoundMultiCharMapping()
-            except FoundMultiCharMapping:
+            # Then, find the longest multi-char mapping starting with the
+            # character
+            node = self._trie.get(char)
+            match = None
+            end = i
+            while node is not None:
+                if None in node:
+                    match = node[None]
+                    i = end
+                if end == len(input_):
+                    break
+                node = node.get(input_[end])
+                end += 1
+            if match is not None:
+                result.append(match)
                 continue
 
             # Otherwise, do a regular lookup in the encoding table
-            result.append(self.codec.encoding_table.get(char, self.codec.replacement_char))
+            result.append(encoding_table.get(char, replacement_char))
 
         return result
 
 
 class A00Codec(Codec):
-    def __init__(self):
-        super(A00Codec, self).__init__(hd44780_a00)
+    def __init__(self, cache_size=0):
+        super(A00Codec, self).__init__(hd44780_a00, cache_size)
 
 
 class A02Codec(Codec):
-    def __init__(self):
-        super(A02Codec, self).__init__(hd44780_a02)
+    def __init__(self, cache_size=0):
+        super(A02Codec, self).__init__(hd44780_a02, cache_size)
 
 
 class ST0BCodec(Codec):
-    def __init__(self):
-        super(ST0BCodec, self).__init__(st7066_0b)
+    def __init__(self, cache_size=0):
+        super(ST0BCodec, self).__init__(st7066_0b, cache_size)
@@ -230,8 +230,7 @@ encoding_table = {
 
 }
 
-# Table with combined mappings
-combined_chars_lookahead = 1
+# Table with combined mappings, the longest matching sequence is used
 combined_chars = {
     '\u207B': [
         ('\u00B9', 0xE9),  # SUPERSCRIPT MINUS + SUPERSCRIPT ONE
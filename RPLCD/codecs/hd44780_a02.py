@@ -284,6 +284,5 @@ encoding_table = {
 
 }
 
-# Table with combined mappings
-combined_chars_lookahead = 0
+# Table with combined mappings, the longest matching sequence is used
 combined_chars = {}
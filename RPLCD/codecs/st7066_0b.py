@@ -282,6 +282,5 @@ encoding_table = {
     '\U0001F13F': 0xff  # SQUARED LATIN CAPITAL LETTER P
 }
 
-# Table with combined mappings
-combined_chars_lookahead = 0
+# Table with combined mappings, the longest matching sequence is used
 combined_chars = {}
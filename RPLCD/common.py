@@ -22,6 +22,7 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import itertools
 import time
+from collections import namedtuple
 
 
 # # # BIT PATTERNS # # #
@@ -92,17 +93,129 @@ class CursorMode(object):
     blink = LCD_CURSOROFF | LCD_BLINKON
 
 
+# # # TIMING PROFILES # # #
+
+# All times are in microseconds:
+#
+# power_on:       Wait after power on, before the first instruction
+# init_long:      Wait after the first two function set instructions
+# init_short:     Wait after the third function set instruction
+# execution:      Execution time of instructions and data writes
+# execution_long: Execution time of clear display and return home
+# enable_pulse:   Width of the enable pulse and setup time before it
+TimingProfile = namedtuple(
+    'TimingProfile', 'power_on init_long init_short execution execution_long enable_pulse'
+)
+
+# Hitachi HD44780 at the reference clock of 270 kHz (37 us and 1.52 ms
+# according to the datasheet), with some headroom for slower controllers.
+TIMING_HD44780 = TimingProfile(
+    power_on=50000,
+    init_long=4500,
+    init_short=100,
+    execution=50,
+    execution_long=2000,
+    enable_pulse=1,
+)
+
+# Sitronix ST7066U, same nominal execution times as the HD44780 but a tighter
+# oscillator tolerance.
+TIMING_ST7066 = TimingProfile(
+    power_on=40000,
+    init_long=4100,
+    init_short=100,
+    execution=45,
+    execution_long=1850,
+    enable_pulse=1,
+)
+
+# Clones that run well below the reference clock. Try this profile if the
+# display shows garbled characters.
+TIMING_SLOW = TimingProfile(
+    power_on=100000,
+    init_long=10000,
+    init_short=250,
+    execution=120,
+    execution_long=5000,
+    enable_pulse=2,
+)
+
+# Controllers running at about twice the reference clock. Make sure your
+# controller really is that fast, e.g. with ``calibrate_timing()``.
+TIMING_FAST = TimingProfile(
+    power_on=50000,
+    init_long=4500,
+    init_short=100,
+    execution=25,
+    execution_long=1000,
+    enable_pulse=1,
+)
+
+
 # # # HELPER FUNCTIONS # # #
 
 
+# Monotonic clock in nanoseconds, used for all deadlines
+now = time.perf_counter_ns
+
+# How much longer than requested ``time.sleep()`` takes on this system, in
+# nanoseconds. Measured on the first wait, see ``calibrate()``.
+_sleep_overshoot = None
+
+
+def calibrate(samples=11):
+    """
+    Measure how much longer than requested ``time.sleep()`` takes on this
+    system and return the overshoot in microseconds.
+
+    This runs once before the first wait. The last part of every wait is
+    done by busy waiting, so that short waits don't take tens of
+    microseconds longer than requested.
+    """
+    global _sleep_overshoot
+    request = 10000  # 10 us
+    overshoots = []
+    for _ in range(samples):
+        start = now()
+        time.sleep(request / 1000000000.0)
+        overshoots.append(now() - start - request)
+    overshoots.sort()
+    _sleep_overshoot = max(0, overshoots[len(overshoots) // 2])
+    return sleep_overshoot()
+
+
+def sleep_overshoot():
+    """Return the overshoot of ``time.sleep()`` measured by ``calibrate()``
+    in microseconds."""
+    if _sleep_overshoot is None:
+        calibrate()
+    return _sleep_overshoot / 1000.0
+
+
+def wait_until(deadline):
+    """
+    Wait until ``now()`` reaches the specified deadline (in nanoseconds).
+
+    Long waits sleep until shortly before the deadline, the rest is done by
+    busy waiting.
+    """
+    if _sleep_overshoot is None:
+        calibrate()
+    remaining = deadline - now()
+    if remaining > 2 * _sleep_overshoot:
+        time.sleep((remaining - 2 * _sleep_overshoot) / 1000000000.0)
+    while now() < deadline:
+        pass
+
+
 def msleep(milliseconds):
     """Sleep the specified amount of milliseconds."""
-    time.sleep(milliseconds / 1000.0)
+    wait_until(now() + int(milliseconds * 1000000))
 
 
 def usleep(microseconds):
     """Sleep the specified amount of microseconds."""
-    time.sleep(microseconds / 1000000.0)
+    wait_until(now() + int(microseconds * 1000))
 
 
 def sliding_window(seq, lookahead):
@@ -20,22 +20,37 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 """
 
-from collections import namedtuple
+from collections import Counter, namedtuple
 
 import RPi.GPIO as GPIO
 
 from . import common as c
 from .lcd import BaseCharLCD
 
-from time import perf_counter as now
-
 # Duration to rate-limit calls to _send
 COMPAT_MODE_WAIT_TIME = 0.001
 
-PinConfig = namedtuple('PinConfig', 'rs rw e d0 d1 d2 d3 d4 d5 d6 d7 backlight mode')
+# Maximum duration to poll the busy flag before giving up. This is longer than
+# the slowest instruction (clear display) on slow controllers.
+BUSY_FLAG_TIMEOUT = 0.01
+
+PinConfig = namedtuple('PinConfig', 'rs rw e d0 d1 d2 d3 d4 d5 d6 d7 backlight mode e2')
+
+# Last output level and number of users of each pin, keyed by the numbering
+# mode and the pin number. These are shared by all displays, because several
+# displays can be connected to the same data lines (each with its own enable
+# line).
+_levels = {}
+_pin_users = Counter()
 
 
 class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
+    # Two nibbles plus the execution time of the controller
+    _instruction_cost = 70
+    _data_cost = 60
+
     def __init__(
         self,
         numbering_mode=None,
@@ -52,6 +67,9 @@ class CharLCD(BaseCharLCD):
         charmap='A02',
         auto_linebreaks=True,
         compat_mode=False,
+        read_busy_flag=False,
+        timing=None,
+        pin_e2=None,
     ):
         """
         Character LCD controller.
@@ -100,12 +118,29 @@ class CharLCD(BaseCharLCD):
         :param compat_mode: Whether to run additional checks to support older LCDs
             that may not run at the reference clock (or keep up with it).
         :type compat_mode: bool
+        :param read_busy_flag: Whether to poll the busy flag of the LCD instead
+            of waiting for a fixed amount of time after every byte. This only
+            has an effect if ``pin_rw`` is set. Warning: When reading, the LCD
+            drives the data pins with its supply voltage. Only use this with
+            3.3V LCDs or with level shifters on the data pins! Default:
+            ``False``.
+        :type read_busy_flag: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+        :param pin_e2: Pin for the enable line of the second controller of
+            displays that have two of them, like 40x4 displays (E2). The
+            first controller drives the upper half of the rows. Reading the
+            busy flag is not supported with two controllers. Default:
+            ``None``.
+        :type pin_e2: int
 
         """
         # Configure compatibility mode
         self.compat_mode = compat_mode
         if compat_mode:
-            self.last_send_event = now()
+            self.last_send_event = c.now()
 
         # Set attributes
         if numbering_mode == GPIO.BCM or numbering_mode == GPIO.BOARD:
@@ -127,6 +162,8 @@ class CharLCD(BaseCharLCD):
             block1 = [None] * 4
         elif len(pins_data) == 8:  # 8 bit mode
             self.data_bus_mode = c.LCD_8BITMODE
+            self._instruction_cost = 65
+            self._data_cost = 55
             block1 = pins_data[:4]
         else:
             raise ValueError('There should be exactly 4 or 8 data pins.')
@@ -145,14 +182,29 @@ class CharLCD(BaseCharLCD):
             d7=block2[3],
             backlight=pin_backlight,
             mode=numbering_mode,
+            e2=pin_e2,
         )
         self.backlight_mode = backlight_mode
 
+        # Enable lines to pulse for every combination of selected controllers
+        enables = [pin for pin in (pin_e, pin_e2) if pin is not None]
+        self._controllers = len(enables)
+        self._enables = [
+            [pin for i, pin in enumerate(enables) if mask & (1 << i)]
+            for mask in range(1 << len(enables))
+        ]
+
+        # The busy flag can only be read after the initialization
+        self._read_busy_flag = False
+
         # Call superclass
         super(CharLCD, self).__init__(
-            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
         )
 
+        # Poll the busy flag from now on, if possible
+        self._read_busy_flag = read_busy_flag and pin_rw is not None and pin_e2 is None
+
         # Set backlight status
         if pin_backlight is not None:
             self.backlight_enabled = backlight_enabled
@@ -160,23 +212,40 @@ class CharLCD(BaseCharLCD):
     def _init_connection(self):
         # Setup GPIO
         GPIO.setmode(self.numbering_mode)
-        for pin in list(filter(None, self.pins))[:-1]:
+        for pin in self._bus_pins():
             GPIO.setup(pin, GPIO.OUT)
+            _pin_users[self.numbering_mode, pin] += 1
         if self.pins.backlight is not None:
             GPIO.setup(self.pins.backlight, GPIO.OUT)
 
         # Initialization
-        c.msleep(50)
-        GPIO.output(self.pins.rs, 0)
-        GPIO.output(self.pins.e, 0)
-        if self.pins.rw is not None:
-            GPIO.output(self.pins.rw, 0)
+        c.usleep(self.timing.power_on)
+        pins = [
+            pin
+            for pin in (self.pins.rs, self.pins.e, self.pins.e2, self.pins.rw)
+            if pin is not None
+        ]
+        self._output(pins, [0] * len(pins))
 
     def _close_connection(self):
+        # Leave the pins that other displays still use alone
+        active_pins = []
+        for pin in self._bus_pins():
+            key = (self.numbering_mode, pin)
+            _pin_users[key] -= 1
+            if _pin_users[key] <= 0:
+                del _pin_users[key]
+                _levels.pop(key, None)
+                active_pins.append(pin)
+        GPIO.cleanup(active_pins)
+
+    def _bus_pins(self):
+        """Return the pins connected to the LCD."""
         pins = (
             self.pins.rs,
             self.pins.rw,
             self.pins.e,
+            self.pins.e2,
             self.pins.d0,
             self.pins.d1,
             self.pins.d2,
@@ -186,8 +255,15 @@ class CharLCD(BaseCharLCD):
             self.pins.d6,
             self.pins.d7,
         )
-        active_pins = [pin for pin in pins if pin is not None]
-        GPIO.cleanup(active_pins)
+        return [pin for pin in pins if pin is not None]
+
+    def _data_pins(self):
+        """Return the data pins in use, starting with the least significant
+        bit."""
+        pins = self.pins
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            return (pins.d0, pins.d1, pins.d2, pins.d3, pins.d4, pins.d5, pins.d6, pins.d7)
+        return (pins.d4, pins.d5, pins.d6, pins.d7)
 
     # Properties
 
@@ -221,12 +297,15 @@ class CharLCD(BaseCharLCD):
         if self.compat_mode:
             self._wait()
 
-        # Choose instruction or data mode
-        GPIO.output(self.pins.rs, mode)
+        # Wait until the previous instruction has been executed
+        self._wait_ready()
 
-        # If the RW pin is used, set it to low in order to write.
+        # Choose instruction or data mode. If the RW pin is used, set it to
+        # low in order to write.
         if self.pins.rw is not None:
-            GPIO.output(self.pins.rw, 0)
+            self._output((self.pins.rs, self.pins.rw), (mode, 0))
+        else:
+            self._output((self.pins.rs,), (mode,))
 
         # Write data out in chunks of 4 or 8 bit
         if self.data_bus_mode == c.LCD_8BITMODE:
@@ -235,9 +314,12 @@ class CharLCD(BaseCharLCD):
             self._write4bits(value >> 4)
             self._write4bits(value)
 
+        # The controller is busy executing the instruction from now on
+        self._settle(self._execution_time(value, mode))
+
         # Record the time for the tail-end of the last send event
         if self.compat_mode:
-            self.last_send_event = now()
+            self.last_send_event = c.now()
 
     def _send_data(self, value):
         """Send data to the display."""
@@ -249,29 +331,94 @@ class CharLCD(BaseCharLCD):
 
     def _write4bits(self, value):
         """Write 4 bits of data into the data bus."""
-        for i in range(4):
-            bit = (value >> i) & 0x01
-            GPIO.output(self.pins[i + 7], bit)
+        pins = (self.pins.d4, self.pins.d5, self.pins.d6, self.pins.d7)
+        self._output(pins, [(value >> i) & 0x01 for i in range(4)])
         self._pulse_enable()
 
     def _write8bits(self, value):
         """Write 8 bits of data into the data bus."""
-        for i in range(8):
-            bit = (value >> i) & 0x01
-            GPIO.output(self.pins[i + 3], bit)
+        self._output(self._data_pins(), [(value >> i) & 0x01 for i in range(8)])
         self._pulse_enable()
 
+    def _output(self, pins, levels):
+        """Set the output levels of several pins with a single call, skipping
+        the pins that already are at the requested level."""
+        changed_pins = []
+        changed_levels = []
+        for pin, level in zip(pins, levels):
+            key = (self.numbering_mode, pin)
+            if _levels.get(key) != level:
+                changed_pins.append(pin)
+                changed_levels.append(level)
+                _levels[key] = level
+        if changed_pins:
+            GPIO.output(changed_pins, changed_levels)
+
     def _pulse_enable(self):
-        """Pulse the `enable` flag to process data."""
-        GPIO.output(self.pins.e, 0)
-        c.usleep(1)
+        """Pulse the `enable` flag of the selected controllers to process
+        data. The enable lines are low between pulses."""
+        enables = self._enables[self._enable_mask]
+        c.usleep(self.timing.enable_pulse)
+        GPIO.output(enables, 1)
+        c.usleep(self.timing.enable_pulse)
+        GPIO.output(enables, 0)
+
+    def _read_busy(self):
+        """Read the busy flag. The data pins must be configured as inputs."""
         GPIO.output(self.pins.e, 1)
-        c.usleep(1)
+        c.usleep(self.timing.enable_pulse)
+        busy = GPIO.input(self.pins.d7)
         GPIO.output(self.pins.e, 0)
-        c.usleep(100)  # commands need > 37us to settle
+        c.usleep(self.timing.enable_pulse)
+        if self.data_bus_mode == c.LCD_4BITMODE:
+            # Clock out the lower nibble of the address counter
+            GPIO.output(self.pins.e, 1)
+            c.usleep(self.timing.enable_pulse)
+            GPIO.output(self.pins.e, 0)
+            c.usleep(self.timing.enable_pulse)
+        return busy
+
+    def _wait_busy(self):
+        """Poll the busy flag until the LCD is ready to accept data. Return
+        whether the flag cleared before the timeout."""
+        pins_data = self._data_pins()
+        for pin in pins_data:
+            GPIO.setup(pin, GPIO.IN)
+            # The output level is unknown once the pin is an output again
+            _levels.pop((self.numbering_mode, pin), None)
+        self._output((self.pins.rs, self.pins.rw), (c.RS_INSTRUCTION, 1))
+
+        # If the flag does not clear in time, RW is probably not connected.
+        # Continue anyway, the timeout is long enough for any instruction.
+        end = c.now() + int(BUSY_FLAG_TIMEOUT * 1000000000)
+        while True:
+            ready = not self._read_busy()
+            if ready or c.now() >= end:
+                break
+
+        self._output((self.pins.rw,), (0,))
+        for pin in pins_data:
+            GPIO.setup(pin, GPIO.OUT)
+        return ready
+
+    def _measure_execution(self, value):
+        if self.pins.rw is None:
+            raise ValueError('Reading the busy flag requires the RW pin.')
+        if self._controllers > 1:
+            raise ValueError('Reading the busy flag is not supported with two controllers.')
+        self._wait_busy()
+        self._send(value, c.RS_INSTRUCTION)
+        start = c.now()
+        if not self._wait_busy():
+            raise RuntimeError('The busy flag did not clear, is the RW pin connected?')
+        return (c.now() - start) / 1000.0
+
+    def _wait_ready(self):
+        if self._read_busy_flag:
+            self._wait_busy()
+        else:
+            super(CharLCD, self)._wait_ready()
 
     def _wait(self):
         """Rate limit the number of send events."""
-        end = self.last_send_event + COMPAT_MODE_WAIT_TIME
-        while now() < end:
-            pass
+        c.wait_until(self.last_send_event + int(COMPAT_MODE_WAIT_TIME * 1000000000))
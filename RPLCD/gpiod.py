@@ -0,0 +1,256 @@
+"""
+Copyright (C) 2013-2023 Danilo Bargen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+
+from collections import namedtuple
+
+import gpiod
+from gpiod.line import Direction, Value
+
+from . import common as c
+from .lcd import BaseCharLCD
+
+PinConfig = namedtuple('PinConfig', 'rs rw e e2 d0 d1 d2 d3 d4 d5 d6 d7 backlight')
+
+
+class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
+    # One ioctl per bus state, three per nibble
+    _instruction_cost = 40
+    _data_cost = 35
+
+    def __init__(
+        self,
+        chip='/dev/gpiochip0',
+        pin_rs=None,
+        pin_rw=None,
+        pin_e=None,
+        pin_e2=None,
+        pins_data=None,
+        pin_backlight=None,
+        backlight_mode='active_low',
+        backlight_enabled=True,
+        cols=20,
+        rows=4,
+        dotsize=8,
+        charmap='A02',
+        auto_linebreaks=True,
+        timing=None,
+    ):
+        """
+        Character LCD controller, connected through the GPIO character device
+        of the Linux kernel (libgpiod v2).
+
+        All lines are requested together. Every state of the bus (e.g. the
+        data lines of a nibble and RS, or the enable line) is set with a
+        single ioctl.
+
+        The pin numbers are the line offsets on the GPIO chip. On the
+        Raspberry Pi, these are the BCM numbers.
+
+        :param chip: Path of the GPIO chip device. Default:
+            ``/dev/gpiochip0``.
+        :type chip: str
+        :param pin_rs: Line for register select (RS).
+        :type pin_rs: int
+        :param pin_rw: Line for selecting read or write mode (R/W). It is kept
+            low, set this to ``None`` if RW is tied to ground. Default:
+            ``None``.
+        :type pin_rw: int
+        :param pin_e: Line to start data read or write (E).
+        :type pin_e: int
+        :param pin_e2: Line for the enable line of the second controller of
+            displays that have two of them, like 40x4 displays (E2). The
+            first controller drives the upper half of the rows. Default:
+            ``None``.
+        :type pin_e2: int
+        :param pins_data: List of data bus lines in 8 bit mode (DB0-DB7) or in
+            4 bit mode (DB4-DB7) in ascending order.
+        :type pins_data: list of int
+        :param pin_backlight: Line for controlling backlight on/off. Set this
+            to ``None`` for no backlight control. Default: ``None``.
+        :type pin_backlight: int
+        :param backlight_mode: Set this to either ``active_high`` or
+            ``active_low`` to configure the operating control for the
+            backlight. Has no effect if pin_backlight is ``None``
+        :type backlight_mode: str
+        :param backlight_enabled: Whether the backlight is enabled initially.
+            Default: ``True``. Has no effect if pin_backlight is ``None``
+        :type backlight_enabled: bool
+        :param rows: Number of display rows (usually 1, 2 or 4). Default: ``4``.
+        :type rows: int
+        :param cols: Number of columns per row (usually 16 or 20). Default ``20``.
+        :type cols: int
+        :param dotsize: Some 1 line displays allow a font height of 10px.
+            Allowed: ``8`` or ``10``. Default: ``8``.
+        :type dotsize: int
+        :param charmap: The character map used. Depends on your LCD. This must
+            be either ``A00`` or ``A02`` or ``ST0B``. Default: ``A02``.
+        :type charmap: str
+        :param auto_linebreaks: Whether or not to automatically insert line
+            breaks. Default: ``True``.
+        :type auto_linebreaks: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+
+        """
+        # Set attributes
+        self.chip = chip
+        if pin_rs is None:
+            raise ValueError('pin_rs is not defined.')
+        if pin_e is None:
+            raise ValueError('pin_e is not defined.')
+        if backlight_mode not in ('active_high', 'active_low'):
+            raise ValueError('backlight_mode must be either active_high or active_low')
+
+        if pins_data is not None and len(pins_data) == 4:  # 4 bit mode
+            self.data_bus_mode = c.LCD_4BITMODE
+            block1 = [None] * 4
+        elif pins_data is not None and len(pins_data) == 8:  # 8 bit mode
+            self.data_bus_mode = c.LCD_8BITMODE
+            block1 = pins_data[:4]
+        else:
+            raise ValueError('There should be exactly 4 or 8 data pins.')
+        block2 = pins_data[-4:]
+        self.pins = PinConfig(
+            rs=pin_rs,
+            rw=pin_rw,
+            e=pin_e,
+            e2=pin_e2,
+            d0=block1[0],
+            d1=block1[1],
+            d2=block1[2],
+            d3=block1[3],
+            d4=block2[0],
+            d5=block2[1],
+            d6=block2[2],
+            d7=block2[3],
+            backlight=pin_backlight,
+        )
+        self.backlight_mode = backlight_mode
+
+        # Enable lines to pulse for every combination of selected controllers
+        enables = [pin for pin in (pin_e, pin_e2) if pin is not None]
+        self._controllers = len(enables)
+        self._enables = [
+            [pin for i, pin in enumerate(enables) if mask & (1 << i)]
+            for mask in range(1 << len(enables))
+        ]
+        self._backlight_enabled = backlight_enabled
+
+        # Call superclass
+        super(CharLCD, self).__init__(
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
+        )
+
+    def _init_connection(self):
+        # Request all lines at once, RS, RW and E start low
+        lines = [pin for pin in self.pins if pin is not None]
+        self._levels = {pin: Value.INACTIVE for pin in lines}
+        if self.pins.backlight is not None:
+            self._levels[self.pins.backlight] = self._backlight_value(self._backlight_enabled)
+        self.request = gpiod.request_lines(
+            self.chip,
+            consumer='RPLCD',
+            config={tuple(lines): gpiod.LineSettings(direction=Direction.OUTPUT)},
+            output_values=self._levels,
+        )
+        c.usleep(self.timing.power_on)
+
+    def _close_connection(self):
+        self.request.release()
+
+    # Properties
+
+    def _get_backlight_enabled(self):
+        if self.pins.backlight is None:
+            raise ValueError('You did not configure a GPIO pin for backlight control!')
+        return self._backlight_enabled
+
+    def _set_backlight_enabled(self, value):
+        if self.pins.backlight is None:
+            raise ValueError('You did not configure a GPIO pin for backlight control!')
+        if not isinstance(value, bool):
+            raise ValueError('backlight_enabled must be set to ``True`` or ``False``.')
+        self._backlight_enabled = value
+        self._set_values({self.pins.backlight: self._backlight_value(value)})
+
+    backlight_enabled = property(
+        _get_backlight_enabled,
+        _set_backlight_enabled,
+        doc='Whether or not to turn on the backlight.',
+    )
+
+    def _backlight_value(self, enabled):
+        """Return the line value that turns the backlight on or off."""
+        if enabled ^ (self.backlight_mode == 'active_low'):
+            return Value.ACTIVE
+        return Value.INACTIVE
+
+    # Low level commands
+
+    def _send(self, value, mode):
+        """Send the specified value to the display with automatic 4bit / 8bit
+        selection. The rs_mode is either ``RS_DATA`` or ``RS_INSTRUCTION``."""
+        # Wait until the previous instruction has been executed
+        self._wait_ready()
+
+        rs = Value.ACTIVE if mode == c.RS_DATA else Value.INACTIVE
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            self._write_bits(rs, self.pins[4:12], value)
+        else:
+            self._write_bits(rs, self.pins[8:12], value >> 4)
+            self._write_bits(rs, self.pins[8:12], value)
+
+        # The controller is busy executing the instruction from now on
+        self._settle(self._execution_time(value, mode))
+
+    def _send_data(self, value):
+        """Send data to the display."""
+        self._send(value, c.RS_DATA)
+
+    def _send_instruction(self, value):
+        """Send instruction to the display."""
+        self._send(value, c.RS_INSTRUCTION)
+
+    def _write_bits(self, rs, pins, value):
+        """Put RS and the bits of the value on the data lines, then pulse the
+        enable lines of the selected controllers."""
+        values = {self.pins.rs: rs}
+        for i, pin in enumerate(pins):
+            values[pin] = Value.ACTIVE if (value >> i) & 0x01 else Value.INACTIVE
+        self._set_values(values)
+        c.usleep(self.timing.enable_pulse)
+        enables = self._enables[self._enable_mask]
+        self._set_values({pin: Value.ACTIVE for pin in enables})
+        c.usleep(self.timing.enable_pulse)
+        self._set_values({pin: Value.INACTIVE for pin in enables})
+
+    def _set_values(self, values):
+        """Set the lines that change to their new values with a single
+        ioctl."""
+        changed = {pin: value for pin, value in values.items() if self._levels[pin] != value}
+        if changed:
+            self.request.set_values(changed)
+            self._levels.update(changed)
@@ -0,0 +1,320 @@
+"""
+Copyright (C) 2013-2023 Danilo Bargen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+
+import ctypes
+import mmap
+import os
+from collections import namedtuple
+
+from . import common as c
+from .lcd import BaseCharLCD
+
+# Register offsets of the BCM2835/BCM2836/BCM2837/BCM2711 GPIO peripheral
+GPFSEL0 = 0x00  # Function select, 3 bits per pin, 10 pins per register
+GPSET0 = 0x1C  # Writing a 1 sets the pin high
+GPCLR0 = 0x28  # Writing a 1 sets the pin low
+GPIO_MAP_SIZE = 0xB4
+
+# Function select value for an output
+GPFSEL_OUTPUT = 0b001
+
+PinConfig = namedtuple('PinConfig', 'rs rw e e2 d0 d1 d2 d3 d4 d5 d6 d7 backlight')
+
+
+class GPIOMem(object):
+    def __init__(self, path='/dev/gpiomem'):
+        """
+        The GPIO registers of the SoC, mapped into memory.
+
+        Every register access is a single 32 bit load or store. Only pins 0
+        to 31 are supported.
+
+        :param path: Path of the device (or file) to map. Default:
+            ``/dev/gpiomem``.
+        :type path: str
+
+        """
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mmap = mmap.mmap(fd, GPIO_MAP_SIZE)
+        finally:
+            os.close(fd)
+        self.registers = (ctypes.c_uint32 * (GPIO_MAP_SIZE // 4)).from_buffer(self._mmap)
+
+    def setup_output(self, pin):
+        """Configure the pin as an output."""
+        index = GPFSEL0 // 4 + pin // 10
+        shift = (pin % 10) * 3
+        value = self.registers[index] & ~(0b111 << shift)
+        self.registers[index] = value | (GPFSEL_OUTPUT << shift)
+
+    def set(self, mask):
+        """Set all pins in the bit mask high."""
+        self.registers[GPSET0 // 4] = mask
+
+    def clear(self, mask):
+        """Set all pins in the bit mask low."""
+        self.registers[GPCLR0 // 4] = mask
+
+    def close(self):
+        del self.registers
+        self._mmap.close()
+
+
+class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
+    # A few register stores per nibble, the execution time of the controller
+    # dominates
+    _instruction_cost = 55
+    _data_cost = 52
+
+    def __init__(
+        self,
+        pin_rs=None,
+        pin_rw=None,
+        pin_e=None,
+        pin_e2=None,
+        pins_data=None,
+        pin_backlight=None,
+        backlight_mode='active_low',
+        backlight_enabled=True,
+        cols=20,
+        rows=4,
+        dotsize=8,
+        charmap='A02',
+        auto_linebreaks=True,
+        timing=None,
+        gpiomem=None,
+    ):
+        """
+        Character LCD controller, connected to the GPIO pins of a Raspberry Pi
+        (up to the Pi 4) that are accessed directly through their registers.
+
+        The data lines and RS are set with one store to the set register and
+        one store to the clear register per nibble, without any library
+        calls in between. The pin numbers are the BCM numbers.
+
+        The Raspberry Pi 5 has a different GPIO peripheral and is not
+        supported, use :class:`RPLCD.gpiod.CharLCD` there.
+
+        :param pin_rs: Pin for register select (RS).
+        :type pin_rs: int
+        :param pin_rw: Pin for selecting read or write mode (R/W). It is kept
+            low, set this to ``None`` if RW is tied to ground. Default:
+            ``None``.
+        :type pin_rw: int
+        :param pin_e: Pin to start data read or write (E).
+        :type pin_e: int
+        :param pin_e2: Pin for the enable line of the second controller of
+            displays that have two of them, like 40x4 displays (E2). The
+            first controller drives the upper half of the rows. Default:
+            ``None``.
+        :type pin_e2: int
+        :param pins_data: List of data bus pins in 8 bit mode (DB0-DB7) or in
+            4 bit mode (DB4-DB7) in ascending order.
+        :type pins_data: list of int
+        :param pin_backlight: Pin for controlling backlight on/off. Set this
+            to ``None`` for no backlight control. Default: ``None``.
+        :type pin_backlight: int
+        :param backlight_mode: Set this to either ``active_high`` or
+            ``active_low`` to configure the operating control for the
+            backlight. Has no effect if pin_backlight is ``None``
+        :type backlight_mode: str
+        :param backlight_enabled: Whether the backlight is enabled initially.
+            Default: ``True``. Has no effect if pin_backlight is ``None``
+        :type backlight_enabled: bool
+        :param rows: Number of display rows (usually 1, 2 or 4). Default: ``4``.
+        :type rows: int
+        :param cols: Number of columns per row (usually 16 or 20). Default ``20``.
+        :type cols: int
+        :param dotsize: Some 1 line displays allow a font height of 10px.
+            Allowed: ``8`` or ``10``. Default: ``8``.
+        :type dotsize: int
+        :param charmap: The character map used. Depends on your LCD. This must
+            be either ``A00`` or ``A02`` or ``ST0B``. Default: ``A02``.
+        :type charmap: str
+        :param auto_linebreaks: Whether or not to automatically insert line
+            breaks. Default: ``True``.
+        :type auto_linebreaks: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+        :param gpiomem: The mapped GPIO registers. They are not closed when
+            the LCD is closed. Default: a new :class:`GPIOMem` instance for
+            ``/dev/gpiomem``, which is closed with the LCD.
+        :type gpiomem: GPIOMem
+
+        """
+        # Set attributes
+        if pin_rs is None:
+            raise ValueError('pin_rs is not defined.')
+        if pin_e is None:
+            raise ValueError('pin_e is not defined.')
+        if backlight_mode not in ('active_high', 'active_low'):
+            raise ValueError('backlight_mode must be either active_high or active_low')
+
+        if pins_data is not None and len(pins_data) == 4:  # 4 bit mode
+            self.data_bus_mode = c.LCD_4BITMODE
+            block1 = [None] * 4
+        elif pins_data is not None and len(pins_data) == 8:  # 8 bit mode
+            self.data_bus_mode = c.LCD_8BITMODE
+            block1 = pins_data[:4]
+        else:
+            raise ValueError('There should be exactly 4 or 8 data pins.')
+        block2 = pins_data[-4:]
+        self.pins = PinConfig(
+            rs=pin_rs,
+            rw=pin_rw,
+            e=pin_e,
+            e2=pin_e2,
+            d0=block1[0],
+            d1=block1[1],
+            d2=block1[2],
+            d3=block1[3],
+            d4=block2[0],
+            d5=block2[1],
+            d6=block2[2],
+            d7=block2[3],
+            backlight=pin_backlight,
+        )
+        for pin in self.pins:
+            if pin is not None and not 0 <= pin < 32:
+                raise ValueError('Only GPIO pins 0 to 31 are supported; got {}'.format(pin))
+        self.backlight_mode = backlight_mode
+
+        # Enable line masks for every combination of selected controllers
+        enables = [pin for pin in (pin_e, pin_e2) if pin is not None]
+        self._controllers = len(enables)
+        self._enables = [
+            sum(1 << pin for i, pin in enumerate(enables) if mask & (1 << i))
+            for mask in range(1 << len(enables))
+        ]
+        self.gpiomem = gpiomem
+
+        # Set and clear masks for every value of the data lines
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            pins_data = self.pins[4:12]
+        else:
+            pins_data = self.pins[8:12]
+        self._data_masks = []
+        for value in range(1 << len(pins_data)):
+            bits = [1 << pin for i, pin in enumerate(pins_data) if (value >> i) & 0x01]
+            zeros = [1 << pin for i, pin in enumerate(pins_data) if not (value >> i) & 0x01]
+            self._data_masks.append((sum(bits), sum(zeros)))
+
+        # Call superclass
+        super(CharLCD, self).__init__(
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
+        )
+
+        # Set backlight status
+        if pin_backlight is not None:
+            self.backlight_enabled = backlight_enabled
+
+    def _init_connection(self):
+        # Only close the registers mapped here, not the ones of the caller
+        self._close_gpiomem = self.gpiomem is None
+        if self._close_gpiomem:
+            self.gpiomem = GPIOMem()
+        # RS, RW and E start low
+        pins = [
+            pin
+            for pin in (self.pins.rs, self.pins.rw, self.pins.e, self.pins.e2)
+            if pin is not None
+        ]
+        self.gpiomem.clear(sum(1 << pin for pin in pins))
+        for pin in self.pins:
+            if pin is not None:
+                self.gpiomem.setup_output(pin)
+        c.usleep(self.timing.power_on)
+
+    def _close_connection(self):
+        if self._close_gpiomem:
+            self.gpiomem.close()
+
+    # Properties
+
+    def _get_backlight_enabled(self):
+        if self.pins.backlight is None:
+            raise ValueError('You did not configure a GPIO pin for backlight control!')
+        return self._backlight_enabled
+
+    def _set_backlight_enabled(self, value):
+        if self.pins.backlight is None:
+            raise ValueError('You did not configure a GPIO pin for backlight control!')
+        if not isinstance(value, bool):
+            raise ValueError('backlight_enabled must be set to ``True`` or ``False``.')
+        self._backlight_enabled = value
+        if value ^ (self.backlight_mode == 'active_low'):
+            self.gpiomem.set(1 << self.pins.backlight)
+        else:
+            self.gpiomem.clear(1 << self.pins.backlight)
+
+    backlight_enabled = property(
+        _get_backlight_enabled,
+        _set_backlight_enabled,
+        doc='Whether or not to turn on the backlight.',
+    )
+
+    # Low level commands
+
+    def _send(self, value, mode):
+        """Send the specified value to the display with automatic 4bit / 8bit
+        selection. The rs_mode is either ``RS_DATA`` or ``RS_INSTRUCTION``."""
+        # Wait until the previous instruction has been executed
+        self._wait_ready()
+
+        rs = 1 << self.pins.rs
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            self._write_bits(self._data_masks[value], rs, mode)
+        else:
+            self._write_bits(self._data_masks[value >> 4], rs, mode)
+            self._write_bits(self._data_masks[value & 0x0F], rs, mode)
+
+        # The controller is busy executing the instruction from now on
+        self._settle(self._execution_time(value, mode))
+
+    def _send_data(self, value):
+        """Send data to the display."""
+        self._send(value, c.RS_DATA)
+
+    def _send_instruction(self, value):
+        """Send instruction to the display."""
+        self._send(value, c.RS_INSTRUCTION)
+
+    def _write_bits(self, masks, rs, mode):
+        """Put RS and the data lines into the state given by the set and clear
+        masks, then pulse the enable lines of the selected controllers."""
+        bits, zeros = masks
+        if mode == c.RS_DATA:
+            bits |= rs
+        else:
+            zeros |= rs
+        self.gpiomem.set(bits)
+        self.gpiomem.clear(zeros)
+        e = self._enables[self._enable_mask]
+        c.usleep(self.timing.enable_pulse)
+        self.gpiomem.set(e)
+        c.usleep(self.timing.enable_pulse)
+        self.gpiomem.clear(e)
@@ -20,12 +20,21 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 """
 
+import math
+import threading
+
 try:
     from smbus import SMBus
 except ImportError:
     from smbus2 import SMBus
 
+try:
+    from smbus2 import i2c_msg
+except ImportError:
+    i2c_msg = None
+
 from . import common as c
+from .i2c_dev import I2CDev
 from .lcd import BaseCharLCD
 
 # PCF8574 backlight control
@@ -37,6 +46,76 @@ PCF8574_E = 0x4
 PIN_READ_WRITE = 0x2  # Not used?
 PIN_REGISTER_SELECT = 0x1  # Not used?
 
+# Maximum number of bytes in an SMBus block write, including the command byte
+SMBUS_BLOCK_SIZE = 33
+
+# Default I2C bus clock in Hz (standard mode)
+I2C_STANDARD_MODE = 100000
+
+# Clock cycles needed to transfer one byte, including the acknowledge bit
+I2C_BYTE_CLOCKS = 9
+
+
+# Supported I2C transports
+TRANSPORTS = ('smbus', 'i2c-dev')
+
+# Open bus handles by port number and transport, shared by all displays on the
+# same bus. Each entry is a list of the bus, its lock and the number of users.
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def acquire_bus(port, transport='smbus'):
+    """
+    Return the shared bus handle and lock for the I2C port, opening the bus
+    if this is its first user. The transport is either ``smbus`` (an
+    ``SMBus`` instance) or ``i2c-dev`` (an :class:`~RPLCD.i2c_dev.I2CDev`
+    instance).
+
+    Every bus operation must hold the lock: SMBus selects the slave address
+    and transfers the data in separate system calls, so concurrent users of
+    one handle would otherwise write to each other's devices.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError('transport must be one of {}; got {}'.format(TRANSPORTS, transport))
+    with _buses_lock:
+        entry = _buses.get((port, transport))
+        if entry is None:
+            bus = SMBus(port) if transport == 'smbus' else I2CDev(port)
+            entry = _buses[port, transport] = [bus, threading.RLock(), 0]
+        entry[2] += 1
+        return entry[0], entry[1]
+
+
+def release_bus(port, transport='smbus'):
+    """Release the shared bus handle of the I2C port, closing it when the
+    last user is gone."""
+    with _buses_lock:
+        entry = _buses[port, transport]
+        entry[2] -= 1
+        if entry[2] == 0:
+            del _buses[port, transport]
+            with entry[1]:
+                entry[0].close()
+
+
+def _pcf8574_states(value, mode, backlight):
+    """Return the PCF8574 states that write the byte in two pulsed nibbles."""
+    states = []
+    for nibble in (value & 0xF0, (value << 4) & 0xF0):
+        data = nibble | mode | backlight
+        states.extend([data, data | PCF8574_E, data])
+    return bytes(states)
+
+
+# PCF8574 states for every byte value, RS mode and backlight setting
+PCF8574_STATES = {
+    (value, mode, backlight): _pcf8574_states(value, mode, backlight)
+    for value in range(256)
+    for mode in (c.RS_INSTRUCTION, c.RS_DATA)
+    for backlight in (PCF8574_BACKLIGHT, PCF8574_NOBACKLIGHT)
+}
+
 # MCP230XX backlight control
 MCP230XX_BACKLIGHT = 0x80
 MCP230XX_NOBACKLIGHT = 0x7F
@@ -47,8 +126,12 @@ MCP230XX_E = 0x4
 MCP230XX_DATAMASK = 0x78
 MCP230XX_DATASHIFT = 3
 
+# MCP23008 IOCON flag to disable the address pointer increment
+MCP23008_IOCON_SEQOP = 0x20
+
 # MCP23008 Register addresses
 MCP23008_IODIR = 0x00
+MCP23008_IOCON = 0x05
 MCP23008_GPIO = 0x09
 
 # MCP23017 Register addresses
@@ -58,7 +141,28 @@ MCP23017_GPIOA = 0x12
 MCP23017_GPIOB = 0x13
 
 
+def _mcp230xx_states(value, mode, backlight):
+    """Return the MCP230XX states that write the byte in two pulsed nibbles."""
+    rs = MCP230XX_RS if mode == c.RS_DATA else 0
+    states = []
+    for nibble in (value >> 4, value & 0x0F):
+        data = (nibble << MCP230XX_DATASHIFT) | rs | backlight
+        states.extend([data, data | MCP230XX_E, data])
+    return bytes(states)
+
+
+# MCP230XX states for every byte value, RS mode and backlight setting
+MCP230XX_STATES = {
+    (value, mode, backlight): _mcp230xx_states(value, mode, backlight)
+    for value in range(256)
+    for mode in (c.RS_INSTRUCTION, c.RS_DATA)
+    for backlight in (MCP230XX_BACKLIGHT, 0)
+}
+
+
 class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
     def __init__(
         self,
         i2c_expander,
@@ -71,6 +175,9 @@ class CharLCD(BaseCharLCD):
         charmap='A02',
         auto_linebreaks=True,
         backlight_enabled=True,
+        timing=None,
+        bus_speed=I2C_STANDARD_MODE,
+        transport='smbus',
     ):
         """
         CharLCD via PCF8574 I2C port expander:
@@ -132,12 +239,36 @@ class CharLCD(BaseCharLCD):
         :type auto_linebreaks: bool
         :param backlight_enabled: Whether the backlight is enabled initially. Default: ``True``.
         :type backlight_enabled: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+        :param bus_speed: The clock speed of the I2C bus in Hz, as configured
+            on the host (e.g. with ``dtparam=i2c_arm_baudrate``). The time the
+            transfers take is deducted from the waits for the LCD. Default:
+            ``100000``.
+        :type bus_speed: int
+        :param transport: How to access the I2C bus. Either ``smbus`` for the
+            ``smbus``/``smbus2`` module or ``i2c-dev`` for writing whole
+            transactions to ``/dev/i2c-<port>`` with the ``I2C_RDWR`` ioctl.
+            Default: ``smbus``.
+        :type transport: str
 
         """
         # Set own address and port.
         self._address = address
         self._port = port
 
+        if transport not in TRANSPORTS:
+            raise ValueError('transport must be one of {}; got {}'.format(TRANSPORTS, transport))
+        self._transport = transport
+
+        if bus_speed <= 0:
+            raise ValueError('bus_speed must be positive; got {}'.format(bus_speed))
+        self._bus_speed = bus_speed
+        # Transfer time of one byte in microseconds
+        self._byte_time = I2C_BYTE_CLOCKS * 1000000 / bus_speed
+
         # Set i2c expander, 'PCF8574', 'MCP23008' and 'MCP23017' are supported.
         if i2c_expander in ['PCF8574', 'MCP23008', 'MCP23017']:
             self._i2c_expander = i2c_expander
@@ -173,18 +304,33 @@ class CharLCD(BaseCharLCD):
         elif self._i2c_expander in ['MCP23008', 'MCP23017']:
             self._backlight = MCP230XX_BACKLIGHT if backlight_enabled else MCP230XX_NOBACKLIGHT
 
+        # Every transaction starts with the slave address (and the register
+        # address on the MCP23008), followed by six states per byte. The
+        # MCP23017 needs a transaction of three bytes per state instead.
+        if self._i2c_expander == 'MCP23017':
+            header = 0
+            self._state_time = 3 * self._byte_time
+        else:
+            header = 1 if self._i2c_expander == 'PCF8574' else 2
+            self._state_time = self._byte_time
+        self._instruction_cost = header * self._byte_time + 6 * self._state_time
+        self._data_cost = 6 * self._state_time
+        # Time from the start of a transaction until the enable line of the
+        # first nibble goes high. The LCD must be ready by then, not earlier.
+        self._lead_in = int((header * self._byte_time + 2 * self._state_time) * 1000)
+
         # Call superclass
         super(CharLCD, self).__init__(
-            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
         )
         # Refresh backlight status
         self.backlight_enabled = backlight_enabled
 
     def _init_connection(self):
-        self.bus = SMBus(self._port)
+        self.bus, self._bus_lock = acquire_bus(self._port, self._transport)
 
         if self._i2c_expander == 'PCF8574':
-            c.msleep(50)
+            c.usleep(self.timing.power_on)
         elif self._i2c_expander in ['MCP23008', 'MCP23017']:
             # Variable for storing data and applying bitmasks and shifting.
             self._mcp_data = 0
@@ -203,12 +349,28 @@ class CharLCD(BaseCharLCD):
                     IODIR = MCP23017_IODIRB
                     self._mcp_gpio = MCP23017_GPIOB
 
-            # Set IO DIRection to output on all GPIOs (GP0-GP7)
-            self.bus.write_byte_data(self._address, IODIR, 0x00)
+            with self._bus_lock:
+                # Set IO DIRection to output on all GPIOs (GP0-GP7)
+                self.bus.write_byte_data(self._address, IODIR, 0x00)
+
+                # Keep the address pointer on the GPIO register, so that
+                # several states can be streamed to it in a single write. This
+                # configures the whole chip, but the LCD uses all of its pins.
+                # On the MCP23017, the pointer would toggle between the A and
+                # B registers instead, and setting IOCON.BANK to avoid that
+                # would move the registers for whoever uses the other bank
+                # (e.g. buttons). So IOCON is left alone there, and every
+                # state is written on its own (see _write_states).
+                if self._i2c_expander == 'MCP23008':
+                    self.bus.write_byte_data(self._address, MCP23008_IOCON, MCP23008_IOCON_SEQOP)
 
     def _close_connection(self):
-        # Nothing to do here?
-        pass
+        if self.bus is not None:
+            release_bus(self._port, self._transport)
+            self.bus = None
+
+    def _transaction(self):
+        return self._bus_lock
 
     # Properties
 
@@ -221,13 +383,15 @@ class CharLCD(BaseCharLCD):
     def _set_backlight_enabled(self, value):
         if self._i2c_expander == 'PCF8574':
             self._backlight = PCF8574_BACKLIGHT if value else PCF8574_NOBACKLIGHT
-            self.bus.write_byte(self._address, self._backlight)
+            with self._bus_lock:
+                self.bus.write_byte(self._address, self._backlight)
         elif self._i2c_expander in ['MCP23008', 'MCP23017']:
             if value is True:
                 self._mcp_data |= MCP230XX_BACKLIGHT
             else:
                 self._mcp_data &= MCP230XX_NOBACKLIGHT
-            self.bus.write_byte_data(self._address, self._mcp_gpio, self._mcp_data)
+            with self._bus_lock:
+                self.bus.write_byte_data(self._address, self._mcp_gpio, self._mcp_data)
 
     backlight_enabled = property(
         _get_backlight_enabled,
@@ -237,52 +401,77 @@ class CharLCD(BaseCharLCD):
 
     # Low level commands
 
+    def _send(self, value, mode):
+        """Send the specified value to the display. The rs_mode is either
+        ``RS_DATA`` or ``RS_INSTRUCTION``."""
+        self._wait_ready()
+        self._write_states(self._states(value, mode))
+        self._settle(self._execution_time(value, mode))
+
     def _send_data(self, value):
-        if self._i2c_expander == 'PCF8574':
-            self.bus.write_byte(self._address, (c.RS_DATA | (value & 0xF0)) | self._backlight)
-            self._pulse_data(c.RS_DATA | (value & 0xF0))
-            self.bus.write_byte(
-                self._address, (c.RS_DATA | ((value << 4) & 0xF0)) | self._backlight
-            )
-            self._pulse_data(c.RS_DATA | ((value << 4) & 0xF0))
-        elif self._i2c_expander in ['MCP23008', 'MCP23017']:
-            self._mcp_data |= MCP230XX_RS
-            self._pulse_data(value >> 4)
-            self._pulse_data(value & 0x0F)
+        """Send data to the display."""
+        self._send(value, c.RS_DATA)
+
+    def _send_data_run(self, values):
+        # Between the last enable pulse of one byte and the first one of the
+        # next byte, two states are transferred. If that takes less than the
+        # execution time of the byte, pad with idle states.
+        gap = self._execution_time(values[0], c.RS_DATA) - 2 * self._state_time
+        states = [self._states(value, c.RS_DATA) for value in values]
+        if gap > 0:
+            padding = states[0][-1:] * math.ceil(gap / self._state_time)
+            states = [s + padding for s in states[:-1]] + states[-1:]
+        self._wait_ready()
+        self._write_states(b''.join(states))
+        self._settle(self._execution_time(values[-1], c.RS_DATA))
 
     def _send_instruction(self, value):
+        """Send instruction to the display."""
+        self._send(value, c.RS_INSTRUCTION)
+
+    def _wait_ready(self):
+        # The transfer of the first states overlaps with the wait
+        c.wait_until(self._ready_at - self._lead_in)
+
+    def _states(self, value, mode):
+        """Return the expander states that write the byte to the display."""
         if self._i2c_expander == 'PCF8574':
-            self.bus.write_byte(
-                self._address, (c.RS_INSTRUCTION | (value & 0xF0)) | self._backlight
-            )
-            self._pulse_data(c.RS_INSTRUCTION | (value & 0xF0))
-            self.bus.write_byte(
-                self._address, (c.RS_INSTRUCTION | ((value << 4) & 0xF0)) | self._backlight
-            )
-            self._pulse_data(c.RS_INSTRUCTION | ((value << 4) & 0xF0))
-        elif self._i2c_expander in ['MCP23008', 'MCP23017']:
-            self._mcp_data &= ~MCP230XX_RS
-            self._pulse_data(value >> 4)
-            self._pulse_data(value & 0x0F)
+            return PCF8574_STATES[value, mode, self._backlight]
+        else:
+            return MCP230XX_STATES[value, mode, self._mcp_data & MCP230XX_BACKLIGHT]
 
-    def _pulse_data(self, value):
-        """Pulse the `enable` flag to process value."""
+    def _write_states(self, states):
+        """Write a sequence of states to the port expander, using as few I2C
+        transactions as possible."""
         if self._i2c_expander == 'PCF8574':
-            self.bus.write_byte(self._address, ((value & ~PCF8574_E) | self._backlight))
-            c.usleep(1)
-            self.bus.write_byte(self._address, value | PCF8574_E | self._backlight)
-            c.usleep(1)
-            self.bus.write_byte(self._address, ((value & ~PCF8574_E) | self._backlight))
-            c.usleep(100)
-        elif self._i2c_expander in ['MCP23008', 'MCP23017']:
-            self._mcp_data &= ~MCP230XX_DATAMASK
-            self._mcp_data |= value << MCP230XX_DATASHIFT
-            self._mcp_data &= ~MCP230XX_E
-            self.bus.write_byte_data(self._address, self._mcp_gpio, self._mcp_data)
-            c.usleep(1)
-            self._mcp_data |= MCP230XX_E
-            self.bus.write_byte_data(self._address, self._mcp_gpio, self._mcp_data)
-            c.usleep(1)
-            self._mcp_data &= ~MCP230XX_E
-            self.bus.write_byte_data(self._address, self._mcp_gpio, self._mcp_data)
-            c.usleep(100)
+            # A block write sends the command byte first, which is just
+            # another state for the PCF8574.
+            register = b''
+        elif self._i2c_expander == 'MCP23008':
+            # All states go to the GPIO register, because the address pointer
+            # does not increment (see IOCON in _init_connection).
+            register = bytes([self._mcp_gpio])
+            self._mcp_data = states[-1]
+        else:
+            # One transaction per state on the MCP23017 (see IOCON in
+            # _init_connection)
+            with self._bus_lock:
+                for state in states:
+                    self.bus.write_byte_data(self._address, self._mcp_gpio, state)
+            self._mcp_data = states[-1]
+            return
+        data = register + states
+        with self._bus_lock:
+            if self._transport == 'i2c-dev':
+                self.bus.write(self._address, data)
+                return
+            if i2c_msg is not None and hasattr(self.bus, 'i2c_rdwr'):
+                self.bus.i2c_rdwr(i2c_msg.write(self._address, data))
+                return
+            step = SMBUS_BLOCK_SIZE - len(register)
+            for i in range(0, len(states), step):
+                chunk = register + states[i : i + step]
+                if len(chunk) == 1:
+                    self.bus.write_byte(self._address, chunk[0])
+                else:
+                    self.bus.write_i2c_block_data(self._address, chunk[0], list(chunk[1:]))
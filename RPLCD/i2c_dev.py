@@ -0,0 +1,97 @@
+"""
+Copyright (C) 2013-2023 Danilo Bargen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+
+import ctypes
+import fcntl
+import os
+
+# ioctl request for combined read/write transfers, see linux/i2c-dev.h
+I2C_RDWR = 0x0707
+
+
+class _I2CMsg(ctypes.Structure):
+    """struct i2c_msg from linux/i2c.h"""
+
+    _fields_ = [
+        ('addr', ctypes.c_uint16),
+        ('flags', ctypes.c_uint16),
+        ('len', ctypes.c_uint16),
+        ('buf', ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+
+class _I2CRdwrIoctlData(ctypes.Structure):
+    """struct i2c_rdwr_ioctl_data from linux/i2c-dev.h"""
+
+    _fields_ = [
+        ('msgs', ctypes.POINTER(_I2CMsg)),
+        ('nmsgs', ctypes.c_uint32),
+    ]
+
+
+class I2CDev(object):
+    def __init__(self, port, buffer_size=512):
+        """
+        I2C bus that writes to ``/dev/i2c-<port>`` with the ``I2C_RDWR`` ioctl.
+
+        Every write is a single I2C transaction of any length and takes one
+        system call. The message and its buffer are allocated once and reused
+        for all writes.
+
+        Besides :meth:`write`, the SMBus write methods used by RPLCD are
+        provided, so that it can replace an ``SMBus`` instance.
+
+        :param port: The I2C port number.
+        :type port: int
+        :param buffer_size: Initial size of the message buffer in bytes. It
+            grows if a longer message is written. Default: ``512``.
+        :type buffer_size: int
+
+        """
+        self.fd = os.open('/dev/i2c-%d' % port, os.O_RDWR)
+        self._buffer = (ctypes.c_uint8 * buffer_size)()
+        self._msg = _I2CMsg(buf=self._buffer)
+        self._request = _I2CRdwrIoctlData(msgs=ctypes.pointer(self._msg), nmsgs=1)
+
+    def write(self, address, data):
+        """Write the bytes to the device with the specified address in a
+        single transaction."""
+        data = bytes(data)
+        if len(data) > len(self._buffer):
+            self._buffer = (ctypes.c_uint8 * len(data))()
+            self._msg.buf = self._buffer
+        ctypes.memmove(self._buffer, data, len(data))
+        self._msg.addr = address
+        self._msg.len = len(data)
+        fcntl.ioctl(self.fd, I2C_RDWR, self._request)
+
+    def write_byte(self, address, value):
+        self.write(address, [value])
+
+    def write_byte_data(self, address, register, value):
+        self.write(address, [register, value])
+
+    def write_i2c_block_data(self, address, register, data):
+        self.write(address, [register] + list(data))
+
+    def close(self):
+        os.close(self.fd)
@@ -0,0 +1,270 @@
+"""
+Copyright (C) 2013-2023 Danilo Bargen
+
+Permission is hereby granted, free of charge, to any person obtaining a copy of
+this software and associated documentation files (the "Software"), to deal in
+the Software without restriction, including without limitation the rights to
+use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+the Software, and to permit persons to whom the Software is furnished to do so,
+subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+
+try:
+    from smbus2 import i2c_msg
+except ImportError:
+    i2c_msg = None
+
+from . import common as c
+from .i2c import I2C_BYTE_CLOCKS, I2C_STANDARD_MODE, TRANSPORTS, acquire_bus, release_bus
+from .lcd import BaseCharLCD
+
+# Control bytes. The Co bit (0x80) is not set, so every byte after the control
+# byte is an instruction or data byte, until the end of the transaction.
+CONTROL_INSTRUCTION = 0x00
+CONTROL_DATA = 0x40
+
+# Maximum number of bytes in an SMBus block write, excluding the control byte
+SMBUS_BLOCK_SIZE = 32
+
+# ST7032 instructions, only available with the extended instruction set
+ST7032_EXTENDED = 0x01  # Function set flag for the extended instruction set
+ST7032_OSC_FREQUENCY = 0x14  # Internal oscillator, 1/5 bias
+ST7032_CONTRAST_LOW = 0x70
+ST7032_POWER_ICON_CONTRAST = 0x5C  # Icon display on, booster on
+ST7032_FOLLOWER_CONTROL = 0x6C  # Follower circuit on, amplifier ratio 4
+
+# Time until the power of the ST7032 follower circuit is stable (in ms)
+ST7032_FOLLOWER_WAIT = 200
+
+
+class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
+    def __init__(
+        self,
+        controller,
+        address=0x3E,
+        port=1,
+        contrast=0.5,
+        cols=16,
+        rows=2,
+        dotsize=8,
+        charmap='A02',
+        auto_linebreaks=True,
+        timing=None,
+        bus_speed=I2C_STANDARD_MODE,
+        transport='smbus',
+    ):
+        """
+        CharLCD with a controller that has a native I²C interface, like the
+        Sitronix ST7032 or the AiP31068.
+
+        Instead of bit-banging the 4-bit protocol through a port expander,
+        every I²C transaction starts with a control byte that selects
+        instruction or data mode, followed by any number of instructions or
+        data bytes. Consecutive cells are therefore written in a single
+        transaction.
+
+        :param controller: Set your LCD controller. Supported: "ST7032",
+            "AiP31068".
+        :type controller: string
+        :param address: The I2C address of your LCD. Default: ``0x3E``.
+        :type address: int
+        :param port: The I2C port number. Default: ``1``.
+        :type port: int
+        :param contrast: A value between 0 and 1, specifying the initial LCD
+            contrast. Only supported by the ST7032. Default: 0.5.
+        :type contrast: float
+        :param cols: Number of columns per row (usually 16 or 20). Default: ``16``.
+        :type cols: int
+        :param rows: Number of display rows (usually 1 or 2). Default: ``2``.
+        :type rows: int
+        :param dotsize: Some 1 line displays allow a font height of 10px.
+            Allowed: 8 or 10. Default: ``8``.
+        :type dotsize: int
+        :param charmap: The character map used. Depends on your LCD. This must
+            be either ``A00`` or ``A02`` or ``ST0B``.
+        :type charmap: str
+        :param auto_linebreaks: Whether or not to automatically insert line breaks.
+            Default: ``True``.
+        :type auto_linebreaks: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+        :param bus_speed: The clock speed of the I2C bus in Hz, as configured
+            on the host (e.g. with ``dtparam=i2c_arm_baudrate``). Default:
+            ``100000``.
+        :type bus_speed: int
+        :param transport: How to access the I2C bus. Either ``smbus`` for the
+            ``smbus``/``smbus2`` module or ``i2c-dev`` for writing whole
+            transactions to ``/dev/i2c-<port>`` with the ``I2C_RDWR`` ioctl.
+            Default: ``smbus``.
+        :type transport: str
+
+        """
+        # Set own address and port.
+        self._address = address
+        self._port = port
+
+        if transport not in TRANSPORTS:
+            raise ValueError('transport must be one of {}; got {}'.format(TRANSPORTS, transport))
+        self._transport = transport
+
+        if bus_speed <= 0:
+            raise ValueError('bus_speed must be positive; got {}'.format(bus_speed))
+        self._bus_speed = bus_speed
+        # Transfer time of one byte in microseconds
+        self._byte_time = I2C_BYTE_CLOCKS * 1000000 / bus_speed
+
+        # Slave address, control byte and instruction in one transaction.
+        # When flushing, data bytes are streamed.
+        self._instruction_cost = 3 * self._byte_time
+        self._data_cost = self._byte_time
+        # The LCD must only be ready once the slave address and the control
+        # byte have been transferred
+        self._lead_in = int(2 * self._byte_time * 1000)
+
+        if controller in ['ST7032', 'AiP31068']:
+            self._controller = controller
+        else:
+            raise NotImplementedError('I2C controller "%s" is not supported.' % controller)
+
+        if controller == 'ST7032' and not (0 <= contrast <= 1):
+            raise ValueError('contrast must be between 0 and 1; got {}'.format(contrast))
+        self._contrast = contrast
+
+        # The I2C interface always transfers 8 bits at once
+        self.data_bus_mode = c.LCD_8BITMODE
+
+        # Call superclass
+        super(CharLCD, self).__init__(
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
+        )
+
+    def _init_connection(self):
+        self.bus, self._bus_lock = acquire_bus(self._port, self._transport)
+        c.usleep(self.timing.power_on)
+
+        if self._controller == 'ST7032':
+            # Power up the internal voltage booster and follower circuit,
+            # this needs the extended instruction set.
+            functionset = self._function_set()
+            self._send_instructions(
+                [
+                    functionset,
+                    functionset | ST7032_EXTENDED,
+                    ST7032_OSC_FREQUENCY,
+                ]
+                + self._contrast_instructions(self._contrast)
+                + [ST7032_FOLLOWER_CONTROL]
+            )
+            self._settle(ST7032_FOLLOWER_WAIT * 1000)
+
+    def _close_connection(self):
+        if self.bus is not None:
+            release_bus(self._port, self._transport)
+            self.bus = None
+
+    def _transaction(self):
+        return self._bus_lock
+
+    # Properties
+
+    def _get_contrast(self):
+        if self._controller != 'ST7032':
+            raise ValueError('Contrast control is only supported by the ST7032.')
+        return self._contrast
+
+    def _set_contrast(self, value):
+        if self._controller != 'ST7032':
+            raise ValueError('Contrast control is only supported by the ST7032.')
+        if not (0 <= value <= 1):
+            raise ValueError('contrast must be between 0 and 1; got {}'.format(value))
+        self._contrast = value
+        functionset = self._function_set()
+        self._send_instructions(
+            [functionset | ST7032_EXTENDED] + self._contrast_instructions(value) + [functionset]
+        )
+
+    contrast = property(_get_contrast, _set_contrast, doc='Set the LCD contrast.')
+
+    def _function_set(self):
+        """Return the function set instruction for the regular instruction set."""
+        lines = c.LCD_1LINE if self.lcd.rows == 1 else c.LCD_2LINE
+        return c.LCD_FUNCTIONSET | self.data_bus_mode | lines
+
+    def _contrast_instructions(self, value):
+        """Return the ST7032 instructions that set the 6 bit contrast value."""
+        contrast = round(value * 0x3F)
+        return [
+            ST7032_CONTRAST_LOW | (contrast & 0x0F),
+            ST7032_POWER_ICON_CONTRAST | (contrast >> 4),
+        ]
+
+    # Low level commands
+
+    def _send_data(self, value):
+        """Send data to the display."""
+        self._wait_ready()
+        with self._bus_lock:
+            self.bus.write_byte_data(self._address, CONTROL_DATA, value)
+        self._settle(self._execution_time(value, c.RS_DATA))
+
+    def _send_data_run(self, values):
+        # Data bytes can only be streamed if each of them takes longer to
+        # transfer than to execute
+        if self._byte_time < self._execution_time(values[0], c.RS_DATA):
+            super(CharLCD, self)._send_data_run(values)
+            return
+        self._wait_ready()
+        self._write(CONTROL_DATA, values)
+        self._settle(self._execution_time(values[-1], c.RS_DATA))
+
+    def _send_instruction(self, value):
+        """Send instruction to the display."""
+        self._wait_ready()
+        with self._bus_lock:
+            self.bus.write_byte_data(self._address, CONTROL_INSTRUCTION, value)
+        self._settle(self._execution_time(value, c.RS_INSTRUCTION))
+
+    def _send_instructions(self, values):
+        """Send several instructions that don't need any waiting in between
+        (i.e. no clear display or return home) to the display."""
+        if self._byte_time < self._execution_time(values[0], c.RS_INSTRUCTION):
+            for value in values:
+                self._send_instruction(value)
+            return
+        self._wait_ready()
+        self._write(CONTROL_INSTRUCTION, values)
+        self._settle(self._execution_time(values[-1], c.RS_INSTRUCTION))
+
+    def _wait_ready(self):
+        # The transfer of the address and control byte overlaps with the wait
+        c.wait_until(self._ready_at - self._lead_in)
+
+    def _write(self, control, values):
+        """Write the control byte, followed by the values, using as few I2C
+        transactions as possible."""
+        with self._bus_lock:
+            if self._transport == 'i2c-dev':
+                self.bus.write(self._address, [control] + list(values))
+                return
+            if i2c_msg is not None and hasattr(self.bus, 'i2c_rdwr'):
+                self.bus.i2c_rdwr(i2c_msg.write(self._address, [control] + list(values)))
+                return
+            for i in range(0, len(values), SMBUS_BLOCK_SIZE):
+                self.bus.write_i2c_block_data(
+                    self._address, control, list(values[i : i + SMBUS_BLOCK_SIZE])
+                )
@@ -21,6 +21,7 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
 from collections import namedtuple
+from contextlib import contextmanager, nullcontext
 
 from . import codecs
 from . import common as c
@@ -33,9 +34,31 @@ LCDConfig = namedtuple('LCDConfig', 'rows cols dotsize')
 
 
 class BaseCharLCD(object):
+    # Estimated cost of sending an instruction and a data byte, in
+    # microseconds. The flush planner uses these figures to decide whether it
+    # is cheaper to rewrite unchanged cells or to set the DDRAM address.
+    # Backends override them according to their bus characteristics.
+    _instruction_cost = 250
+    _data_cost = 200
+
+    # Backends that poll the busy flag before every byte set this
+    _read_busy_flag = False
+
+    # Backends call ``_wait_ready`` before putting a byte on the bus and
+    # ``_settle`` with the execution time afterwards, and set this. For other
+    # backends, the base class wraps ``_send_instruction`` and ``_send_data``
+    # to do the same.
+    _keeps_deadlines = False
+
+    # Number of controllers, each with its own enable line. Backends that
+    # support a second enable line (e.g. for 40x4 displays) override this.
+    _controllers = 1
+
     # Init, setup, teardown
 
-    def __init__(self, cols=20, rows=4, dotsize=8, charmap='A02', auto_linebreaks=True):
+    def __init__(
+        self, cols=20, rows=4, dotsize=8, charmap='A02', auto_linebreaks=True, timing=None
+    ):
         """
         Character LCD controller. Base class only, you should use a subclass.
 
@@ -53,6 +76,10 @@ class BaseCharLCD(object):
             auto_linebreaks:
                 Whether or not to automatically insert line breaks.
                 Default: True.
+            timing:
+                The timing profile of the LCD controller, one of the
+                ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+                ``TimingProfile``. Default: ``TIMING_HD44780``.
 
         """
         assert dotsize in [8, 10], 'The ``dotsize`` argument should be either 8 or 10.'
@@ -73,10 +100,26 @@ class BaseCharLCD(object):
 
         # LCD configuration
         self.lcd = LCDConfig(rows=rows, cols=cols, dotsize=dotsize)
+        self.timing = c.TIMING_HD44780 if timing is None else timing
+
+        # With several controllers, each one drives the same number of rows.
+        # Transfers go to the controllers selected by the bits of the enable
+        # mask, which is a single controller for cell writes and all of them
+        # for any other instruction.
+        if rows % self._controllers != 0:
+            raise ValueError(
+                'The {} rows cannot be split between {} controllers.'.format(
+                    rows, self._controllers
+                )
+            )
+        self._rows_per_controller = rows // self._controllers
+        self._all_controllers = (1 << self._controllers) - 1
+        self._enable_mask = self._all_controllers
+        self._cursor_controller = 1
 
         # Setup initial display configuration
         displayfunction = self.data_bus_mode | c.LCD_5x8DOTS
-        if rows == 1:
+        if self._rows_per_controller == 1:
             displayfunction |= c.LCD_1LINE
         elif rows in [2, 4]:
             # LCD only uses two lines on 4 row displays
@@ -88,10 +131,27 @@ class BaseCharLCD(object):
         # Create content cache
         self._content = [[0x20] * cols for _ in range(rows)]
 
+        # Deferred mode is disabled by default, every write goes straight to
+        # the display.
+        self._deferred = False
+        self._frame_depth = 0
+
+        # Number of bus transactions saved by the flush planner, compared to
+        # writing the changed cells character by character.
+        self.transactions_saved = 0
+
         # Set up auto linebreaks
         self.auto_linebreaks = auto_linebreaks
         self.recent_auto_linebreak = False
 
+        # Point in time (see ``common.now``) before which the controller is
+        # still busy executing the previous instruction
+        self._ready_at = 0
+
+        if not self._keeps_deadlines:
+            self._send_instruction = self._keep_deadlines(self._send_instruction, c.RS_INSTRUCTION)
+            self._send_data = self._keep_deadlines(self._send_data, c.RS_DATA)
+
         # Initialize display
         self._init_connection()
 
@@ -99,31 +159,29 @@ class BaseCharLCD(object):
         if self.data_bus_mode == c.LCD_4BITMODE:
             # Hitachi manual page 46
             self.command(0x03)
-            c.msleep(4.5)
+            self._settle(self.timing.init_long)
             self.command(0x03)
-            c.msleep(4.5)
+            self._settle(self.timing.init_long)
             self.command(0x03)
-            c.usleep(100)
+            self._settle(self.timing.init_short)
             self.command(0x02)
         elif self.data_bus_mode == c.LCD_8BITMODE:
             # Hitachi manual page 45
             self.command(0x30)
-            c.msleep(4.5)
+            self._settle(self.timing.init_long)
             self.command(0x30)
-            c.usleep(100)
+            self._settle(self.timing.init_short)
             self.command(0x30)
         else:
             raise ValueError('Invalid data bus mode: {}'.format(self.data_bus_mode))
 
         # Write configuration to display
         self.command(c.LCD_FUNCTIONSET | displayfunction)
-        c.usleep(50)
 
         # Configure display mode
         self._display_mode = c.LCD_DISPLAYON
         self._cursor_mode = c.CursorMode.hide
         self.command(c.LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        c.usleep(50)
 
         # Clear display
         self.clear()
@@ -133,10 +191,12 @@ class BaseCharLCD(object):
         self._display_shift_mode = c.ShiftMode.cursor
         self._cursor_pos = (0, 0)
         self.command(c.LCD_ENTRYMODESET | self._text_align_mode | self._display_shift_mode)
-        c.usleep(50)
 
     def close(self, clear=False):
         if clear:
+            # Clear the display itself, pending changes of deferred mode are
+            # dropped.
+            self._deferred = False
             self.clear()
         self._close_connection()
 
@@ -153,10 +213,13 @@ class BaseCharLCD(object):
         ):
             msg = 'Cursor position {pos!r} invalid on a {lcd.rows}x{lcd.cols} LCD.'
             raise ValueError(msg.format(pos=value, lcd=self.lcd))
-        row_offsets = [0x00, 0x40, self.lcd.cols, 0x40 + self.lcd.cols]
         self._cursor_pos = value
-        self.command(c.LCD_SETDDRAMADDR | row_offsets[value[0]] + value[1])
-        c.usleep(50)
+        if self._deferred:
+            # The address counter is updated on the next flush
+            return
+        self._select_row(value[0])
+        self._send_instruction(c.LCD_SETDDRAMADDR | self._ddram_address(*value))
+        self._follow_cursor()
 
     cursor_pos = property(
         _get_cursor_pos, _set_cursor_pos, doc='The cursor position as a 2-tuple (row, col).'
@@ -178,7 +241,6 @@ class BaseCharLCD(object):
         else:
             raise ValueError('Text align mode must be either `left` or `right`')
         self.command(c.LCD_ENTRYMODESET | self._text_align_mode | self._display_shift_mode)
-        c.usleep(50)
 
     text_align_mode = property(
         _get_text_align_mode,
@@ -195,6 +257,8 @@ class BaseCharLCD(object):
             raise ValueError('Internal _display_shift_mode has invalid value.')
 
     def _set_write_shift_mode(self, value):
+        if self._deferred and value == 'display':
+            raise ValueError('Deferred mode only supports the `cursor` write shift mode.')
         if value == 'cursor':
             self._display_shift_mode = c.ShiftMode.cursor
         elif value == 'display':
@@ -202,7 +266,6 @@ class BaseCharLCD(object):
         else:
             raise ValueError('Write shift mode must be either `cursor` or `display`.')
         self.command(c.LCD_ENTRYMODESET | self._text_align_mode | self._display_shift_mode)
-        c.usleep(50)
 
     write_shift_mode = property(
         _get_write_shift_mode,
@@ -215,8 +278,7 @@ class BaseCharLCD(object):
 
     def _set_display_enabled(self, value):
         self._display_mode = c.LCD_DISPLAYON if value else c.LCD_DISPLAYOFF
-        self.command(c.LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        c.usleep(50)
+        self._send_display_control()
 
     display_enabled = property(
         _get_display_enabled, _set_display_enabled, doc='Whether or not to display any characters.'
@@ -241,8 +303,7 @@ class BaseCharLCD(object):
             self._cursor_mode = c.CursorMode.blink
         else:
             raise ValueError('Cursor mode must be one of `hide`, `line` or `blink`.')
-        self.command(c.LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        c.usleep(50)
+        self._send_display_control()
 
     cursor_mode = property(
         _get_cursor_mode,
@@ -250,6 +311,32 @@ class BaseCharLCD(object):
         doc='How the cursor should behave (``hide``, ``line`` or ``blink``).',
     )
 
+    def _get_deferred(self):
+        return self._deferred
+
+    def _set_deferred(self, value):
+        if value == self._deferred:
+            return
+        if value:
+            if self._display_shift_mode == c.ShiftMode.display:
+                raise ValueError('Deferred mode only supports the `cursor` write shift mode.')
+            # Remember what is currently shown on the display, so that the
+            # flush only needs to send the difference.
+            self._flushed_content = [row[:] for row in self._content]
+            self._flushed_cursor_pos = self._cursor_pos
+            self._overflow = []
+            self._deferred = True
+        else:
+            self.flush()
+            self._deferred = False
+
+    deferred = property(
+        _get_deferred,
+        _set_deferred,
+        doc='Whether writes are collected in the content cache until '
+        ':meth:`flush` is called, instead of being sent to the display right away.',
+    )
+
     # High level commands
 
     def write_string(self, value):
@@ -279,7 +366,7 @@ class BaseCharLCD(object):
             u'Temperature: 30\xb0C'
 
         """
-        encoded = self.codec.encode(value)  # type: List[int]
+        encoded = self.codec.encode(value)  # type: Sequence[int]
         ignored = False
 
         for [char, lookahead] in c.sliding_window(encoded, lookahead=1):
@@ -316,18 +403,87 @@ class BaseCharLCD(object):
                 else:
                     self.cursor_pos = (row, self.lcd.cols - 1)
 
+    def write_frame(self, rows):
+        """
+        Replace the whole display content with the specified rows.
+
+        The rows are a list of unicode strings, one per display row. Rows
+        shorter than the display are padded with blanks. Newlines and carriage
+        returns are not allowed.
+
+        Unlike :meth:`write_string`, the rows are not written character by
+        character. Instead, only the cells that differ from the current
+        display content are sent (see :meth:`flush`). The cursor position is
+        not changed.
+
+        Example:
+
+        .. sourcecode:: python
+
+            >>> lcd.write_frame(['Temp: 21°C', 'Status: OK'])
+
+        """
+        if isinstance(rows, str):
+            raise ValueError('Frame must be a list of rows, not a string.')
+        if len(rows) > self.lcd.rows:
+            raise ValueError('Frame has more than {} rows.'.format(self.lcd.rows))
+        encoded = []
+        for row in rows:
+            chars = self.codec.encode(row)
+            if codecs.CR in chars or codecs.LF in chars:
+                raise ValueError('Frame rows must not contain newlines or carriage returns.')
+            if len(chars) > self.lcd.cols:
+                raise ValueError(
+                    'Frame row {!r} is longer than {} columns.'.format(row, self.lcd.cols)
+                )
+            encoded.append(list(chars) + [0x20] * (self.lcd.cols - len(chars)))
+        for _ in range(self.lcd.rows - len(rows)):
+            encoded.append([0x20] * self.lcd.cols)
+        self._replace_content(encoded)
+
+    def write_bytes(self, buffer):
+        """
+        Replace the whole display content with an already encoded buffer.
+
+        The buffer (``bytes`` or ``bytearray``) contains exactly ``rows *
+        cols`` bytes in the character map of the display, row by row. Like
+        with :meth:`write_frame`, only the changed cells are sent.
+        """
+        cols = self.lcd.cols
+        if len(buffer) != self.lcd.rows * cols:
+            raise ValueError('Buffer must contain exactly {} bytes.'.format(self.lcd.rows * cols))
+        self._replace_content(
+            [list(buffer[row * cols : (row + 1) * cols]) for row in range(self.lcd.rows)]
+        )
+
+    def _replace_content(self, content):
+        """Replace the content cache, flushing unless in deferred mode."""
+        if self._deferred:
+            self._content = content
+            return
+        with self.frame():
+            self._content = content
+
     def clear(self):
         """Overwrite display with blank characters and reset cursor position."""
-        self.command(c.LCD_CLEARDISPLAY)
         self._cursor_pos = (0, 0)
         self._content = [[0x20] * self.lcd.cols for _ in range(self.lcd.rows)]
-        c.msleep(2)
+        if self._deferred:
+            # Overwriting the changed cells on flush is cheaper than a full
+            # clear, which takes more than 1.5 ms to execute.
+            self._overflow = []
+            return
+        self.command(c.LCD_CLEARDISPLAY)
+        self._follow_cursor()
 
     def home(self):
         """Set cursor to initial position and reset any shifting."""
         self.command(c.LCD_RETURNHOME)
         self._cursor_pos = (0, 0)
-        c.msleep(2)
+        if self._deferred:
+            self._flushed_cursor_pos = (0, 0)
+        else:
+            self._follow_cursor()
 
     def shift_display(self, amount):
         """Shift the display. Use negative amounts to shift left and positive
@@ -337,7 +493,6 @@ class BaseCharLCD(object):
         direction = c.LCD_MOVERIGHT if amount > 0 else c.LCD_MOVELEFT
         for i in range(abs(amount)):
             self.command(c.LCD_CURSORSHIFT | c.LCD_DISPLAYMOVE | direction)
-            c.usleep(50)
 
     def create_char(self, location, bitmap):
         """Create a new character.
@@ -382,12 +537,377 @@ class BaseCharLCD(object):
             self._send_data(row)
 
         # Restore cursor pos
+        if self._deferred:
+            # The address counter now points into CGRAM, make sure the next
+            # flush moves it back to DDRAM.
+            self._flushed_cursor_pos = None
         self.cursor_pos = pos
 
+    def calibrate_timing(self, margin=1.5, samples=5):
+        """
+        Measure the execution times of the LCD controller by reading the busy
+        flag and return the tightest safe timing profile.
+
+        Only the gpio backend supports this, with the RW pin connected and a
+        single controller. Other backends raise a ``ValueError``. The measured
+        times are multiplied by ``margin``. Note that this resets any display
+        shift, because the return home instruction is used for measuring.
+
+        Example:
+
+        .. sourcecode:: python
+
+            >>> lcd.timing = lcd.calibrate_timing()
+
+        :param margin: Factor applied to the longest measured times.
+        :type margin: float
+        :param samples: Number of measurements per instruction.
+        :type samples: int
+        :returns: The calibrated timing profile.
+        :rtype: TimingProfile
+        :raises ValueError: Raised when the busy flag cannot be read.
+        """
+        pos = self._cursor_pos
+        entrymode = c.LCD_ENTRYMODESET | self._text_align_mode | self._display_shift_mode
+        times = []
+        times_long = []
+        for _ in range(samples):
+            times.append(self._measure_execution(entrymode))
+            times_long.append(self._measure_execution(c.LCD_RETURNHOME))
+
+        # Restore cursor pos
+        self._cursor_pos = (0, 0)
+        if self._deferred:
+            self._flushed_cursor_pos = (0, 0)
+        if pos != (0, 0):
+            self.cursor_pos = pos
+
+        return self.timing._replace(
+            execution=int(max(times) * margin) + 1,
+            execution_long=int(max(times_long) * margin) + 1,
+        )
+
+    # Deferred mode
+
+    @contextmanager
+    def frame(self):
+        """
+        Context manager that collects all writes in the block and sends them
+        to the display in one go when the block is left.
+
+        Inside the block, :meth:`write_string`, :meth:`write`,
+        :attr:`cursor_pos` and :meth:`clear` only update the content cache.
+        When leaving the outermost block, :meth:`flush` sends only the cells
+        that actually changed.
+
+        If the block raises an exception, nothing is sent. Unless deferred
+        mode was already enabled before, the changes made in the block are
+        discarded.
+
+        Example:
+
+        .. sourcecode:: python
+
+            >>> with lcd.frame():
+            ...     lcd.clear()
+            ...     lcd.write_string('Temp: 21°C')
+            ...     lcd.cursor_pos = (1, 0)
+            ...     lcd.write_string('Status: OK')
+
+        """
+        was_deferred = self._deferred
+        self.deferred = True
+        self._frame_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._frame_depth -= 1
+            if self._frame_depth == 0 and not was_deferred:
+                self._discard()
+            raise
+        self._frame_depth -= 1
+        if self._frame_depth == 0:
+            self.deferred = was_deferred
+            if was_deferred:
+                self.flush()
+
+    def _discard(self):
+        """Drop the changes collected in deferred mode and leave it without
+        sending anything."""
+        self._content = [row[:] for row in self._flushed_content]
+        self._overflow = []
+        self._deferred = False
+        if self._flushed_cursor_pos is None:
+            # The address counter still points into CGRAM
+            self.cursor_pos = self._cursor_pos
+        else:
+            self._cursor_pos = self._flushed_cursor_pos
+
+    def flush(self):
+        """
+        Send all changes collected in deferred mode to the display.
+
+        The changed cells are sent in DDRAM address order. Between two changed
+        cells, unchanged cells are rewritten if that is cheaper than moving
+        the address counter (see :attr:`transactions_saved`). On displays with
+        several controllers, only the controllers with changed cells are
+        written to, and controllers with identical changes at the same
+        positions are written to at the same time.
+
+        Does nothing if deferred mode is disabled.
+        """
+        if not self._deferred:
+            return
+
+        cursor = self._row_controller(self._cursor_pos[0])
+        plans = []
+        seek = []
+        for controller in range(self._controllers):
+            cells = self._ddram_cells(controller)
+            plan, address, naive = self._plan_flush(cells, controller)
+            self.transactions_saved += naive - len(plan)
+
+            # Cells outside of the visible area are not cached, replay them
+            for row, col, value in self._overflow:
+                if self._row_controller(row) != controller:
+                    continue
+                plan.append((c.RS_INSTRUCTION, c.LCD_SETDDRAMADDR | self._ddram_address(row, col)))
+                plan.append((c.RS_DATA, value))
+                address = None
+
+            # Move the address counter to the cursor position
+            if controller == cursor and (
+                self._cursor_pos != self._flushed_cursor_pos or address is not None
+            ):
+                self._plan_seek(seek, cells, address, self._ddram_address(*self._cursor_pos))
+                self._flushed_cursor_pos = self._cursor_pos
+            plans.append(plan)
+        self._overflow = []
+
+        with self._transaction():
+            for controller, plan in enumerate(plans):
+                # Put the data on the bus once for all controllers that need
+                # the same changes
+                mask = 1 << controller
+                for other in range(controller + 1, self._controllers):
+                    if plan and plans[other] == plan:
+                        mask |= 1 << other
+                        plans[other] = []
+                if mask == 1 << cursor:
+                    plan = plan + seek
+                    seek = []
+                if plan:
+                    self._enable_mask = mask
+                    self._send_plan(plan)
+            if seek:
+                self._enable_mask = 1 << cursor
+                self._send_plan(seek)
+            self._follow_cursor()
+
+    def _send_plan(self, plan):
+        """Send a plan to the selected controllers, with consecutive data
+        writes as a single run."""
+        run = []
+        for mode, value in plan:
+            if mode == c.RS_DATA:
+                run.append(value)
+                continue
+            if run:
+                self._send_data_run(run)
+                run = []
+            self._send_instruction(value)
+        if run:
+            self._send_data_run(run)
+
+    def _plan_flush(self, cells, controller=0):
+        """
+        Plan the cheapest sequence of instructions and data writes that
+        updates all changed cells, based on the ``_instruction_cost`` and
+        ``_data_cost`` of the backend.
+
+        Returns a tuple ``(plan, address, naive)``. The plan is a list of
+        ``(mode, value)`` tuples, with the mode being either ``RS_INSTRUCTION``
+        or ``RS_DATA``. The address is the position of the address counter
+        after executing the plan (or ``None`` if nothing needs to be sent).
+        The last element is the number of transactions that writing the
+        changed part of every row character by character would have needed.
+
+        Only the rows of the specified controller are planned.
+        """
+        step = 1 if self._text_align_mode == c.Alignment.left else -1
+        dirty = []
+        naive = 0
+        first = controller * self._rows_per_controller
+        for row in range(first, first + self._rows_per_controller):
+            old = self._flushed_content[row]
+            new = self._content[row]
+            changed = [col for col in range(self.lcd.cols) if old[col] != new[col]]
+            if not changed:
+                continue
+            # One address set, followed by one transaction per cell
+            naive += 1 + changed[-1] - changed[0] + 1
+            for col in changed:
+                dirty.append(self._ddram_address(row, col))
+                old[col] = new[col]
+        dirty.sort(reverse=step == -1)
+
+        plan = []
+        address = None
+        for target in dirty:
+            self._plan_seek(plan, cells, address, target)
+            row, col = cells[target]
+            plan.append((c.RS_DATA, self._content[row][col]))
+            address = target + step
+        return plan, address, naive
+
+    def _plan_seek(self, plan, cells, address, target):
+        """
+        Append the cheapest way of moving the address counter from
+        ``address`` to ``target`` to the plan.
+
+        If the cells in between are all visible, rewriting them with their
+        current content moves the address counter as well.
+        """
+        if address == target:
+            return
+        if address is not None:
+            step = 1 if self._text_align_mode == c.Alignment.left else -1
+            gap = range(address, target, step)
+            if (
+                len(gap) > 0
+                and len(gap) * self._data_cost < self._instruction_cost
+                and all(a in cells for a in gap)
+            ):
+                for a in gap:
+                    row, col = cells[a]
+                    plan.append((c.RS_DATA, self._content[row][col]))
+                return
+        plan.append((c.RS_INSTRUCTION, c.LCD_SETDDRAMADDR | target))
+
+    def _ddram_address(self, row, col):
+        """Return the DDRAM address of the specified cell, in the controller
+        that drives the row."""
+        row_offsets = [0x00, 0x40, self.lcd.cols, 0x40 + self.lcd.cols]
+        if self._controllers > 1:
+            row -= self._row_controller(row) * self._rows_per_controller
+        return row_offsets[row] + col
+
+    def _ddram_cells(self, controller=0):
+        """Return a dictionary mapping the DDRAM address of every visible
+        cell of the controller to its ``(row, col)`` position."""
+        first = controller * self._rows_per_controller
+        return {
+            self._ddram_address(row, col): (row, col)
+            for row in range(first, first + self._rows_per_controller)
+            for col in range(self.lcd.cols)
+        }
+
+    # Controller selection
+
+    def _row_controller(self, row):
+        """Return the index of the controller that drives the row."""
+        return min(row // self._rows_per_controller, self._controllers - 1)
+
+    def _select_row(self, row):
+        """Send the following cell writes to the controller that drives the
+        row."""
+        self._enable_mask = 1 << self._row_controller(row)
+
+    def _send_display_control(self):
+        """Send the display control instruction. With several controllers,
+        only the one with the cursor shows it."""
+        value = c.LCD_DISPLAYCONTROL | self._display_mode
+        if self._controllers == 1:
+            self.command(value | self._cursor_mode)
+            return
+        self._cursor_controller = 1 << self._row_controller(self._cursor_pos[0])
+        self._enable_mask = self._all_controllers & ~self._cursor_controller
+        self._send_instruction(value)
+        self._enable_mask = self._cursor_controller
+        self._send_instruction(value | self._cursor_mode)
+
+    def _follow_cursor(self):
+        """Show the cursor on the controller it moved to."""
+        if self._controllers == 1 or self._cursor_mode == c.CursorMode.hide:
+            return
+        if 1 << self._row_controller(self._cursor_pos[0]) != self._cursor_controller:
+            self._send_display_control()
+
     # Mid level commands
 
+    def _send_data_run(self, values):
+        """
+        Send several data bytes in a row. Backends that can transfer a run of
+        bytes more efficiently than byte by byte override this.
+        """
+        for value in values:
+            self._send_data(value)
+
+    def _execution_time(self, value, mode):
+        """
+        Return the number of microseconds the controller needs to execute the
+        specified instruction or data write: 37 us and 1.52 ms (clear display
+        and return home) according to the datasheet, with some headroom for
+        controllers running below the reference clock.
+        """
+        if mode == c.RS_INSTRUCTION and (
+            value == c.LCD_CLEARDISPLAY or value & 0xFE == c.LCD_RETURNHOME
+        ):
+            return self.timing.execution_long
+        return self.timing.execution
+
+    def _keep_deadlines(self, send, mode):
+        """
+        Wrap a send method of a backend that doesn't keep the execution
+        deadlines itself (see ``_keeps_deadlines``), so that it waits for the
+        controller before every byte.
+        """
+
+        def send_when_ready(value):
+            self._wait_ready()
+            send(value)
+            self._settle(self._execution_time(value, mode))
+
+        return send_when_ready
+
+    def _measure_execution(self, value):
+        """
+        Send the specified instruction and return the time in microseconds
+        until the busy flag clears. Backends that can read the busy flag
+        implement this, and raise a ``ValueError`` before sending anything if
+        the wiring doesn't allow it.
+        """
+        raise ValueError('This backend cannot read the busy flag.')
+
+    def _settle(self, microseconds):
+        """
+        Don't send anything to the controller for the specified amount of
+        microseconds, starting now.
+
+        Instead of sleeping right away, this records a deadline. The next bus
+        operation waits for it in :meth:`_wait_ready`, so whatever happens in
+        between already counts towards the waiting time.
+        """
+        self._ready_at = max(self._ready_at, c.now() + int(microseconds * 1000))
+
+    def _transaction(self):
+        """
+        Return a context manager that keeps the bus to the display for
+        several bus operations, e.g. for a whole flush. Backends that share
+        their bus with other devices override this.
+        """
+        return nullcontext()
+
+    def _wait_ready(self):
+        """
+        Wait until the controller is ready for the next instruction or data
+        write. Backends call this before putting a byte on the bus.
+        """
+        c.wait_until(self._ready_at)
+
     def command(self, value):
-        """Send a raw command to the LCD."""
+        """Send a raw command to the LCD (to all controllers)."""
+        self._enable_mask = self._all_controllers
         self._send_instruction(value)
 
     def write(self, value):  # type: (int) -> None
@@ -398,7 +918,12 @@ class BaseCharLCD(object):
 
         # Write byte if changed
         try:
-            if self._content[row][col] != value:
+            if self._deferred:
+                # Only update the content cache, the flush sends the byte
+                self._content[row][col] = value
+                unchanged = False
+            elif self._content[row][col] != value:
+                self._select_row(row)
                 self._send_data(value)
                 self._content[row][col] = value  # Update content cache
                 unchanged = False
@@ -408,7 +933,11 @@ class BaseCharLCD(object):
             # Position out of range
             if self.auto_linebreaks is True:
                 raise e
-            self._send_data(value)
+            if self._deferred:
+                self._overflow.append((row, col, value))
+            else:
+                self._select_row(row)
+                self._send_data(value)
             unchanged = False
 
         # Update cursor position.
@@ -21,6 +21,9 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 """
 
+import os
+import threading
+import weakref
 from collections import namedtuple
 
 import pigpio
@@ -38,11 +41,149 @@ PWM = 0.125
 
 PinConfig = namedtuple('PinConfig', 'rs rw e e2 d0 d1 d2 d3 d4 d5 d6 d7 backlight contrast')
 
+# The write script takes the bank mask of the enable lines, followed by the
+# set and clear masks of up to 4 chunks of data (e.g. 2 bytes in 4 bit mode).
+# Unused chunks are zero.
+SCRIPT_MASKS = 8
+
+# Backlight fades and contrast ramps change the duty cycle at most every
+# RAMP_INTERVAL ms, in at most RAMP_STEPS steps
+RAMP_INTERVAL = 10
+RAMP_STEPS = 100
+
+# pigpiod connections opened by the pigpio backend, keyed by host and port:
+# [pi, number of users]
+_connections = {}
+# Write scripts stored in pigpiod, keyed by connection and script text
+_scripts = {}
+# Locks for building waveforms, keyed by connection
+_wave_locks = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def _pigpiod_address(host, port):
+    """Return the host and port of pigpiod, with the same defaults as
+    ``pigpio.pi``."""
+    if host is None:
+        host = os.getenv('PIGPIO_ADDR', 'localhost')
+    if port is None:
+        port = os.getenv('PIGPIO_PORT', 8888)
+    return host, int(port)
+
+
+def acquire_pi(host=None, port=None):
+    """
+    Return the shared connection to the pigpio daemon, connecting to it if
+    this is its first user. Host and port default to the ``PIGPIO_ADDR`` and
+    ``PIGPIO_PORT`` environment variables, or ``localhost:8888``.
+    """
+    address = _pigpiod_address(host, port)
+    with _registry_lock:
+        entry = _connections.get(address)
+        if entry is None:
+            pi = pigpio.pi(*address)
+            if not pi.connected:
+                raise IOError('Could not connect to pigpiod at {}:{}'.format(*address))
+            entry = _connections[address] = [pi, 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_pi(host=None, port=None):
+    """Release the shared connection to the pigpio daemon, stopping it when
+    the last user is gone."""
+    address = _pigpiod_address(host, port)
+    with _registry_lock:
+        entry = _connections[address]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _connections[address]
+            entry[0].stop()
+
+
+class StoredScript(object):
+    """
+    A script stored in pigpiod, shared by everyone who acquires the same
+    script text on the same connection.
+
+    pigpiod copies the parameters of a run into the script even if it is
+    still running, so a run must only be started once the previous one is
+    done. All runs therefore go through :meth:`run`, which holds the lock.
+    """
+
+    def __init__(self, pi, text):
+        self.pi = pi
+        self.text = text
+        self.id = pi.store_script(text)
+        self.lock = threading.RLock()
+        self.users = 0
+        # The script can only be run once pigpiod has initialized it
+        self._pending = True
+
+    def wait(self):
+        """Wait until pigpiod reports the last run of the script as done."""
+        with self.lock:
+            while self._pending:
+                status = self.pi.script_status(self.id)[0]
+                if status == pigpio.PI_SCRIPT_HALTED:
+                    self._pending = False
+                elif status == pigpio.PI_SCRIPT_FAILED:
+                    raise pigpio.error('pigpio script {} failed'.format(self.id))
+                else:
+                    c.usleep(1)
+
+    def run(self, params):
+        """Run the script with the parameters, as soon as its previous run is
+        done."""
+        with self.lock:
+            self.wait()
+            self.pi.run_script(self.id, params)
+            self._pending = True
+
+
+def _wave_lock(pi):
+    """Return the lock for building waveforms on the connection. pigpiod
+    builds one waveform at a time, shared by all of its clients."""
+    with _registry_lock:
+        lock = _wave_locks.get(pi)
+        if lock is None:
+            lock = _wave_locks[pi] = threading.Lock()
+        return lock
+
+
+def acquire_script(pi, text):
+    """Return the :class:`StoredScript` with the text on the connection,
+    storing it in pigpiod if this is its first user."""
+    with _registry_lock:
+        script = _scripts.get((pi, text))
+        if script is None:
+            script = _scripts[pi, text] = StoredScript(pi, text)
+        script.users += 1
+        return script
+
+
+def release_script(script):
+    """Release the stored script, deleting it from pigpiod when the last
+    user is gone."""
+    with _registry_lock:
+        script.users -= 1
+        if script.users == 0:
+            del _scripts[script.pi, script.text]
+            with script.lock:
+                script.wait()
+                script.pi.delete_script(script.id)
+
 
 class CharLCD(BaseCharLCD):
+    _keeps_deadlines = True
+
+    # One script run per byte, including the round-trip to pigpiod
+    _instruction_cost = 200
+    _data_cost = 180
+
     def __init__(
         self,
-        pi,
+        pi=None,
         pin_rs=None,
         pin_rw=None,
         pin_e=None,
@@ -61,6 +202,9 @@ class CharLCD(BaseCharLCD):
         dotsize=8,
         charmap='A02',
         auto_linebreaks=True,
+        read_busy_flag=False,
+        timing=None,
+        use_waves=False,
     ):
         """
         Character LCD controller.
@@ -70,7 +214,10 @@ class CharLCD(BaseCharLCD):
         You can save 1 pin by not using RW. Set ``pin_rw`` to ``None`` if you
         want this.
 
-        :param pi: A pigpio.pi object to access the GPIOs.
+        :param pi: A pigpio.pi object to access the GPIOs. It is not stopped
+            when the LCD is closed. If ``None``, the connection to the local
+            pigpio daemon is shared with the other displays that do the same
+            (see :func:`acquire_pi`). Default: ``None``.
         :type pi: pigpio.pi object
         :param pin_rs: Pin for register select (RS). Default: ``15``.
         :type pin_rs: int
@@ -79,6 +226,12 @@ class CharLCD(BaseCharLCD):
         :type pin_rw: int
         :param pin_e: Pin to start data read or write (E). Default: ``16``.
         :type pin_e: int
+        :param pin_e2: Pin for the enable line of the second controller of
+            displays that have two of them, like 40x4 displays (E2). The
+            first controller drives the upper half of the rows. Reading the
+            busy flag is not supported with two controllers. Default:
+            ``None``.
+        :type pin_e2: int
         :param pins_data: List of data bus pins in 8 bit mode (DB0-DB7) or in 4
             bit mode (DB4-DB7) in ascending order. Default: ``[21, 22, 23, 24]``.
         :type pins_data: list of int
@@ -127,11 +280,34 @@ class CharLCD(BaseCharLCD):
         :param auto_linebreaks: Whether or not to automatically insert line
             breaks. Default: ``True``.
         :type auto_linebreaks: bool
+        :param read_busy_flag: Whether to poll the busy flag of the LCD instead
+            of waiting for a fixed amount of time after every byte. This only
+            has an effect if ``pin_rw`` is set. Warning: When reading, the LCD
+            drives the data pins with its supply voltage. Only use this with
+            3.3V LCDs or with level shifters on the data pins! Default:
+            ``False``.
+        :type read_busy_flag: bool
+        :param timing: The timing profile of the LCD controller, one of the
+            ``TIMING_*`` profiles in ``RPLCD.common`` or a custom
+            ``TimingProfile``. Default: ``TIMING_HD44780``.
+        :type timing: TimingProfile
+        :param use_waves: Whether to send runs of bytes (e.g. when flushing a
+            frame) as a single pigpio waveform with hardware timed enable
+            pulses, instead of running the write script once per byte. Has no
+            effect if the busy flag is read. Default: ``False``.
+        :type use_waves: bool
 
         """
 
-        # Save the pigpio.pi object
+        # Save the pigpio.pi object, or share a connection if there is none
         self.pi = pi
+        self._shared_pi = pi is None
+        self.use_waves = use_waves
+        self._wave = None
+        # Scripts of running (or finished) fades, keyed by pin, and their
+        # start level, end level, start time and duration
+        self._ramps = {}
+        self._ramp_levels = {}
 
         # Set attributes
         if pin_rs is None:
@@ -168,12 +344,29 @@ class CharLCD(BaseCharLCD):
         self.backlight_pwm = backlight_pwm
         self.contrast_mode = contrast_mode
         self.contrast_pwm = contrast_pwm
+        self._controllers = 1 if pin_e2 is None else 2
+        for pin in filter(lambda pin: pin is not None, self.pins[:12]):
+            if not 0 <= pin < 32:
+                raise ValueError('LCD pins must be between GPIO 0 and 31; got {}'.format(pin))
+        self._build_masks()
+        if use_waves:
+            # Within a wave, a byte only takes its execution time
+            self._data_cost = 60
+
+        # The busy flag can only be read after the initialization
+        self._read_busy_flag = False
 
         # Call superclass
         super(CharLCD, self).__init__(
-            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks
+            cols, rows, dotsize, charmap=charmap, auto_linebreaks=auto_linebreaks, timing=timing
         )
 
+        # Poll the busy flag from now on, if possible
+        if read_busy_flag and pin_rw is not None and pin_e2 is None:
+            self._read_busy_flag = True
+            self._delete_writescript()
+            self._script = self._store_writescript()
+
         # Set backlight status
         if pin_backlight is not None:
             self.backlight_enabled = backlight_enabled
@@ -183,6 +376,10 @@ class CharLCD(BaseCharLCD):
             self.contrast = contrast
 
     def _init_connection(self):
+        if self._shared_pi:
+            self.pi = acquire_pi()
+        self._wave_lock = _wave_lock(self.pi)
+
         # Setup GPIO
         for pin in list(filter(None, self.pins)):
             self.pi.set_mode(pin, pigpio.OUTPUT)
@@ -196,7 +393,7 @@ class CharLCD(BaseCharLCD):
                 self.pi.set_PWM_frequency(self.pins.contrast, self.contrast_pwm)
 
         # Initialization
-        c.msleep(50)
+        c.usleep(self.timing.power_on)
         self.pi.write(self.pins.rs, 0)
         self.pi.write(self.pins.e, 0)
         if self.pins.e2 is not None:
@@ -204,65 +401,124 @@ class CharLCD(BaseCharLCD):
         if self.pins.rw is not None:
             self.pi.write(self.pins.rw, 0)
 
-        # pigpio script to pulse the enable flag to process data
-        enablepulse = [
-            'write {pin.e} 0',
-            'mics 1',
-            'trig {pin.e} 1 1',
-            'mics 100',  # Commands need > 37us to settle
-        ]
+        self._script = self._store_writescript()
 
-        # pigpio script to write data to the LCD
-        piscript = ['write {pin.rs} p0']  # Choose instruction or data mode
-        if self.pins.rw is not None:
-            # If the RW pin is used, set it to low
-            piscript.append('write {pin.rw} 0')
+    def _build_masks(self):
+        """Precompute the GPIO bank 1 masks that put a value on the data bus.
+
+        ``_chunk_masks[mode][bits]`` is the ``(set, clear)`` pair for one
+        chunk of 4 or 8 bits, with RS set according to the mode and RW low.
+        ``_byte_params[mode][value]`` are the masks of all chunks of a byte,
+        as passed to the write script. ``_enables[mask]`` is the bank mask
+        of the enable lines selected by the ``_enable_mask``.
+        """
         if self.data_bus_mode == c.LCD_8BITMODE:
-            # Script to write 8 bits of data into the data bus.
-            piscript.extend(  # Write data in 1 chunk of 8 bits
-                [
-                    'write {pin.d0} p1',  # Write 8 bits of data into the data bus
-                    'write {pin.d1} p2',
-                    'write {pin.d2} p3',
-                    'write {pin.d3} p4',
-                    'write {pin.d4} p5',
-                    'write {pin.d5} p6',
-                    'write {pin.d6} p7',
-                    'write {pin.d7} p8',
-                ]
-            )
-            piscript.extend(enablepulse)  # Process data
+            pins_data = self.pins[4:12]
         else:
-            piscript.extend(  # Write data in 2 chunks of 4 bits
-                [
-                    'write {pin.d4} p5',  # Write 4 bits of data into the data bus
-                    'write {pin.d5} p6',
-                    'write {pin.d6} p7',
-                    'write {pin.d7} p8',
-                ]
-            )
-            piscript.extend(enablepulse)  # Process data
-            piscript.extend(
-                [
-                    'write {pin.d4} p1',  # Write 4 bits of data into the data bus
-                    'write {pin.d5} p2',
-                    'write {pin.d6} p3',
-                    'write {pin.d7} p4',
+            pins_data = self.pins[8:12]
+        rs = 1 << self.pins.rs
+        rw = 0 if self.pins.rw is None else 1 << self.pins.rw
+
+        self._chunk_masks = {}
+        self._byte_params = {}
+        for mode in (c.RS_INSTRUCTION, c.RS_DATA):
+            chunks = []
+            for bits in range(1 << len(pins_data)):
+                on = rs if mode == c.RS_DATA else 0
+                off = rw | (0 if mode == c.RS_DATA else rs)
+                for i, pin in enumerate(pins_data):
+                    if (bits >> i) & 0x01:
+                        on |= 1 << pin
+                    else:
+                        off |= 1 << pin
+                chunks.append((on, off))
+            self._chunk_masks[mode] = chunks
+            if self.data_bus_mode == c.LCD_8BITMODE:
+                self._byte_params[mode] = [list(chunks[value]) for value in range(256)]
+            else:
+                self._byte_params[mode] = [
+                    list(chunks[value >> 4] + chunks[value & 0x0F]) for value in range(256)
                 ]
-            )
-            piscript.extend(enablepulse)  # Process data
+
+        self._enables = [0] * 4
+        for mask in range(4):
+            for i, pin in enumerate((self.pins.e, self.pins.e2)):
+                if pin is not None and mask & (1 << i):
+                    self._enables[mask] |= 1 << pin
+
+    def _store_writescript(self):
+        """Store the pigpio script that writes a run of bytes to the LCD, or
+        share it with other displays that use the same script."""
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            pins_data = ['d0', 'd1', 'd2', 'd3', 'd4', 'd5', 'd6', 'd7']
+            chunks = 1
+        else:
+            pins_data = ['d4', 'd5', 'd6', 'd7']
+            chunks = 2
+        # Number of bytes per script run. With the busy flag, every byte
+        # must be preceded by polling it.
+        self._run_length = 1 if self._read_busy_flag else SCRIPT_MASKS // (2 * chunks)
+
+        piscript = []
+        if self._read_busy_flag:
+            # Poll the busy flag until the previous instruction has been
+            # executed, but give up after 10 ms.
+            readpulse = ['write {pin.e} 1', 'mics {timing.enable_pulse}', 'read {pin.d7}']
+            readpulse.extend(['sta v0', 'write {pin.e} 0', 'mics {timing.enable_pulse}'])
+            if self.data_bus_mode == c.LCD_4BITMODE:
+                # Clock out the lower nibble of the address counter
+                readpulse.extend(['write {pin.e} 1', 'mics {timing.enable_pulse}'])
+                readpulse.extend(['write {pin.e} 0', 'mics {timing.enable_pulse}'])
+            piscript.extend(['modes {pin.%s} r' % pin for pin in pins_data])
+            piscript.extend(['write {pin.rs} 0', 'write {pin.rw} 1', 'ld v1 1000', 'tag 900'])
+            piscript.extend(readpulse)
+            piscript.extend(['lda v0', 'jz 901', 'mics 10', 'dcr v1', 'lda v1', 'jnz 900'])
+            piscript.extend(['tag 901', 'write {pin.rw} 0'])
+            piscript.extend(['modes {pin.%s} w' % pin for pin in pins_data])
+
+        # pigpio script to write data to the LCD. Every chunk updates RS, RW
+        # and the data lines with one bank set and one bank clear, and is
+        # then processed with a pulse on the enable lines selected in p0.
+        for byte in range(self._run_length):
+            first = 1 + 2 * chunks * byte
+            if byte > 0:
+                # Stop at the first unused byte, otherwise wait until the
+                # previous (data) byte has been executed
+                piscript.extend(['lda p%d' % first, 'or p%d' % (first + 1), 'jz 999'])
+                piscript.append('mics {timing.execution}')
+            for param in range(first, first + 2 * chunks, 2):
+                piscript.extend(['bs1 p%d' % param, 'bc1 p%d' % (param + 1)])
+                piscript.extend(['mics {timing.enable_pulse}', 'bs1 p0'])
+                piscript.extend(['mics {timing.enable_pulse}', 'bc1 p0'])
+        if self._run_length > 1:
+            piscript.append('tag 999')
 
         # Make one string and insert the pin values
-        piscript = ' '.join(piscript).format(pin=self.pins)
-        # Send the string to pigpiod (it expects a byte string)
-        self._writescript = self.pi.store_script(bytes(piscript, 'utf-8'))
+        piscript = ' '.join(piscript).format(pin=self.pins, timing=self.timing)
+        # pigpiod expects a byte string
+        return acquire_script(self.pi, bytes(piscript, 'utf-8'))
+
+    def _delete_writescript(self):
+        """Release the pigpio write script, it is deleted once it is done and
+        no other display uses it."""
+        release_script(self._script)
+
+    def _run_script(self, masks):
+        """Run the write script with the bank masks of one or more bytes, as
+        soon as its previous run is done."""
+        params = [self._enables[self._enable_mask]] + masks
+        params.extend([0] * (SCRIPT_MASKS - len(masks)))
+        self._script.run(params)
 
     def _close_connection(self):
-        while self.pi.script_status(self._writescript) == pigpio.PI_SCRIPT_RUNNING:
-            c.msleep(10)
-        self.pi.delete_script(self._writescript)
+        self._delete_writescript()
+        self._delete_wave()
+        for pin in list(self._ramps):
+            self._stop_ramp(pin)
 
-        self.pi.stop()
+        # Only stop the connection if it was opened for the shared displays
+        if self._shared_pi:
+            release_pi()
 
     # Properties
 
@@ -290,14 +546,10 @@ class CharLCD(BaseCharLCD):
                     'backlight_enabled must be set to ``True`` or ``False``, '
                     'if PWM is not enabled; got: {}'.format(value)
                 )
+        self._stop_ramp(self.pins.backlight)
         self._backlight_enabled = value
         if self.backlight_pwm:
-            # Convert perceived brightness (as requested by `value`) to duty
-            # cycle (see comment above definition of PWM):
-            dc = 2 ** (value / PWM) - 1
-            if self.backlight_mode == 'active_low':
-                dc = 255 - dc
-            self.pi.set_PWM_dutycycle(self.pins.backlight, round(dc))
+            self.pi.set_PWM_dutycycle(self.pins.backlight, self._backlight_duty_cycle(value))
         else:
             self.pi.write(self.pins.backlight, value ^ (self.backlight_mode == 'active_low'))
 
@@ -319,13 +571,126 @@ class CharLCD(BaseCharLCD):
             raise ValueError('You did not configure a GPIO pin for contrast control!')
         if not (0 <= value <= 1):
             raise ValueError('contrast must be between 0 and 1; got {}'.format(value))
+        self._stop_ramp(self.pins.contrast)
         self._contrast = value
+        self.pi.set_PWM_dutycycle(self.pins.contrast, self._contrast_duty_cycle(value))
+
+    contrast = property(_get_contrast, _set_contrast, doc='Set the LCD contrast.')
+
+    def _backlight_duty_cycle(self, value):
+        # Convert perceived brightness (as requested by `value`) to duty
+        # cycle (see comment above definition of PWM):
+        dc = 2 ** (value / PWM) - 1
+        if self.backlight_mode == 'active_low':
+            dc = 255 - dc
+        return round(dc)
+
+    def _contrast_duty_cycle(self, value):
         dc = 255 * value
         if self.contrast_mode == 'active_low':
             dc = 255 - dc
-        self.pi.set_PWM_dutycycle(self.pins.contrast, round(dc))
+        return round(dc)
 
-    contrast = property(_get_contrast, _set_contrast, doc='Set the LCD contrast.')
+    # High level commands
+
+    def fade_backlight(self, value, duration):
+        """
+        Fade the brightness of the backlight to the specified value between
+        0 and 1, with the same perceptual curve as ``backlight_enabled``.
+        The fade is run by pigpiod, so this returns immediately. Setting
+        ``backlight_enabled`` stops the fade.
+
+        :param value: The brightness at the end of the fade.
+        :type value: float
+        :param duration: The duration of the fade in seconds.
+        :type duration: float
+
+        """
+        if self.pins.backlight is None:
+            raise ValueError('You did not configure a GPIO pin for backlight control!')
+        if not self.backlight_pwm:
+            raise ValueError('Fading the backlight requires PWM (backlight_pwm).')
+        if not (0 <= value <= 1):
+            raise ValueError('value must be between 0 and 1; got {}'.format(value))
+        self._ramp(
+            self.pins.backlight,
+            self._backlight_duty_cycle,
+            float(self._backlight_enabled),
+            value,
+            duration,
+        )
+        self._backlight_enabled = value
+
+    def ramp_contrast(self, value, duration):
+        """
+        Change the contrast linearly to the specified value between 0 and 1.
+        The ramp is run by pigpiod, so this returns immediately. Setting
+        ``contrast`` stops the ramp.
+
+        :param value: The contrast at the end of the ramp.
+        :type value: float
+        :param duration: The duration of the ramp in seconds.
+        :type duration: float
+
+        """
+        if self.pins.contrast is None:
+            raise ValueError('You did not configure a GPIO pin for contrast control!')
+        if not (0 <= value <= 1):
+            raise ValueError('contrast must be between 0 and 1; got {}'.format(value))
+        self._ramp(self.pins.contrast, self._contrast_duty_cycle, self._contrast, value, duration)
+        self._contrast = value
+
+    def _ramp(self, pin, duty_cycle, start, end, duration):
+        """Store and run a pigpio script that changes the level of the pin
+        linearly from ``start`` to ``end`` over the duration in seconds,
+        setting the PWM duty cycle to ``duty_cycle(level)``. If a previous
+        ramp of the pin is interrupted, the new one starts where it stopped
+        instead. Durations shorter than half a ``RAMP_INTERVAL`` set the
+        final duty cycle right away."""
+        if duration < 0:
+            raise ValueError('duration must not be negative; got {}'.format(duration))
+        start = self._ramp_level(pin, start)
+        self._stop_ramp(pin)
+        steps = min(RAMP_STEPS, round(duration * 1000 / RAMP_INTERVAL))
+        if steps == 0:
+            # Too short for a single step, no need for a script
+            self.pi.set_PWM_dutycycle(pin, duty_cycle(end))
+            return
+        interval = duration * 1000 / steps
+
+        # Only change the duty cycle when it differs from the previous step
+        piscript = []
+        previous = None
+        waited = 0
+        for step in range(1, steps + 1):
+            waited += interval
+            dc = duty_cycle(start + (end - start) * step / steps)
+            if dc != previous:
+                piscript.append('mils %d pwm %d %d' % (round(waited), pin, dc))
+                previous = dc
+                waited = 0
+
+        self._ramps[pin] = script = acquire_script(self.pi, bytes(' '.join(piscript), 'utf-8'))
+        script.run([])
+        self._ramp_levels[pin] = (start, end, c.now(), duration)
+
+    def _ramp_level(self, pin, level):
+        """Return the level the ramp of the pin has reached by now, or the
+        specified level if there is no ramp."""
+        if pin not in self._ramp_levels:
+            return level
+        start, end, started, duration = self._ramp_levels[pin]
+        x = min(1, (c.now() - started) / (duration * 1000000000))
+        return start + (end - start) * x
+
+    def _stop_ramp(self, pin):
+        """Stop the fade of the pin, if there is one."""
+        self._ramp_levels.pop(pin, None)
+        script = self._ramps.pop(pin, None)
+        if script is not None:
+            with script.lock:
+                self.pi.stop_script(script.id)
+                release_script(script)
 
     # Low level commands
 
@@ -333,21 +698,97 @@ class CharLCD(BaseCharLCD):
         """Send the specified value to the display with automatic 4bit / 8bit
         selection. The rs_mode is either ``RS_DATA`` or ``RS_INSTRUCTION``."""
 
-        # Assemble the parameters sent to the pigpio script
-        params = [mode]
-        params.extend([(value >> i) & 0x01 for i in range(8)])
-        # Switch off pigpio's exceptions, so that we get the return codes
-        pigpio.exceptions = False
-        while True:
-            ret = self.pi.run_script(self._writescript, params)
-            if ret >= 0:
-                break
-            elif ret != pigpio.PI_SCRIPT_NOT_READY:
-                raise pigpio.error(pigpio.error_text(ret))
-            # If pigpio script is not ready, sleep and try again
-            c.usleep(1)
-        # Switch on pigpio's exceptions
-        pigpio.exceptions = True
+        # Wait until the previous instruction has been executed
+        self._wait_ready()
+
+        self._run_script(self._byte_params[mode][value])
+
+        # The controller is busy executing the instruction from now on
+        self._settle(self._execution_time(value, mode))
+
+    def _send_data_run(self, values):
+        if not self.use_waves or self._read_busy_flag or len(values) < 2:
+            self._send_script_runs(values)
+            return
+        pulses, micros = self._wave_pulses(values, c.RS_DATA)
+
+        # The previous wave has been transmitted once the LCD is ready
+        self._wait_ready()
+        with self._script.lock:
+            self._script.wait()
+            self._delete_wave()
+            # Start from an empty waveform, in case someone else left pulses
+            # behind, and don't let anyone add theirs until it is sent.
+            # Sending aborts the wave that is being transmitted, so wait for
+            # the one of another display on the connection to finish first.
+            with self._wave_lock:
+                while self.pi.wave_tx_busy():
+                    c.usleep(10)
+                self.pi.wave_add_new()
+                self.pi.wave_add_generic(pulses)
+                self._wave = self.pi.wave_create()
+                self.pi.wave_send_once(self._wave)
+
+        # The wave is transmitted in the background, and the LCD is busy
+        # executing the last byte after that
+        self._settle(micros)
+
+    def _send_script_runs(self, values):
+        """Send data bytes with as few runs of the write script as possible.
+        Each run is submitted as soon as the previous one is done."""
+        params = self._byte_params[c.RS_DATA]
+        execution = self.timing.execution
+        pulses = 2 * self.timing.enable_pulse * (1 if self.data_bus_mode == c.LCD_8BITMODE else 2)
+        for i in range(0, len(values), self._run_length):
+            run = values[i : i + self._run_length]
+            masks = []
+            for value in run:
+                masks.extend(params[value])
+            self._wait_ready()
+            self._run_script(masks)
+            # The script waits for the execution of all but the last byte
+            self._settle(len(run) * (pulses + execution))
+
+    def _wave_pulses(self, values, mode):
+        """Return the pigpio pulses that write the values to the LCD, and
+        their total duration in microseconds."""
+        if self.data_bus_mode == c.LCD_8BITMODE:
+            chunks = [(value,) for value in values]
+        else:
+            chunks = [(value >> 4, value & 0x0F) for value in values]
+        masks = self._chunk_masks[mode]
+        e = self._enables[self._enable_mask]
+        pulse_width = self.timing.enable_pulse
+
+        pulses = []
+        micros = 0
+        for value, chunk in zip(values, chunks):
+            for n, bits in enumerate(chunk):
+                on, off = masks[bits]
+                # Wait for the execution of the byte after its last nibble
+                if n == len(chunk) - 1:
+                    delay = self._execution_time(value, mode)
+                else:
+                    delay = pulse_width
+                pulses.append(pigpio.pulse(on, off, pulse_width))
+                pulses.append(pigpio.pulse(e, 0, pulse_width))
+                pulses.append(pigpio.pulse(0, e, delay))
+                micros += 2 * pulse_width + delay
+        return pulses, micros
+
+    def _delete_wave(self):
+        """Delete the last waveform. It must have been transmitted."""
+        if self._wave is not None:
+            self.pi.wave_delete(self._wave)
+            self._wave = None
+
+    def _transaction(self):
+        return self._script.lock
+
+    def _wait_ready(self):
+        # With the busy flag, the write script itself waits for the LCD
+        if not self._read_busy_flag:
+            super(CharLCD, self)._wait_ready()
 
     def _send_data(self, value):
         """Send data to the display."""
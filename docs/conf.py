@@ -267,6 +267,8 @@ texinfo_documents = [
 sys.modules['RPi'] = mock.Mock()
 sys.modules['RPi.GPIO'] = mock.Mock()
 sys.modules['pigpio'] = mock.Mock()
+sys.modules['gpiod'] = mock.Mock()
+sys.modules['gpiod.line'] = mock.Mock()
 
 autodoc_default_flags = ['members', 'inherited-members', 'undoc-members']
 autoclass_content = 'init'
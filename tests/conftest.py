@@ -4,9 +4,14 @@ import pytest
 
 # Mock RPi.GPIO module (https://m.reddit.com/r/Python/comments/5eddp5/mock_testing_rpigpio/)
 MockRPi = MagicMock()
+MockGpiod = MagicMock()
 modules = {
     'RPi': MockRPi,
     'RPi.GPIO': MockRPi.GPIO,
+    'smbus': MagicMock(),  # Mock smbus module for the I2C backend
+    'pigpio': MagicMock(),  # Mock pigpio module for the pigpio backend
+    'gpiod': MockGpiod,
+    'gpiod.line': MockGpiod.line,
 }
 patcher = patch.dict('sys.modules', modules)
 patcher.start()
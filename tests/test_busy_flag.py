@@ -0,0 +1,81 @@
+import pytest
+
+from RPLCD import common
+from RPLCD.gpio import CharLCD
+
+
+def test_busy_flag_polling(mocker, charlcd_kwargs):
+    """
+    With the busy flag enabled, DB7 should be read with RW high until the
+    flag clears, instead of sleeping for a fixed amount of time.
+    """
+    import RPi.GPIO as GPIO
+
+    lcd = CharLCD(read_busy_flag=True, **charlcd_kwargs)
+    levels = {}
+    reads = []
+
+    def output(pins, values):
+        if not isinstance(pins, list):
+            pins = [pins]
+        if not isinstance(values, list):
+            values = [values] * len(pins)
+        levels.update(zip(pins, values))
+
+    def read(pin):
+        # Unchanged levels are not written again, RS was low before
+        reads.append((pin, levels.get(lcd.pins.rs, 0), levels[lcd.pins.rw]))
+        return len(reads) < 3  # Busy twice, then ready
+
+    mocker.patch.object(GPIO, 'output', side_effect=output)
+    mocker.patch.object(GPIO, 'input', side_effect=read)
+    usleep = mocker.patch.object(common, 'usleep')
+    msleep = mocker.patch.object(common, 'msleep')
+
+    lcd.clear()
+
+    # DB7 is read in instruction mode with RW high, polling stops as soon as
+    # the flag clears
+    assert reads == [(lcd.pins.d7, 0, 1)] * 3
+    # RW is low again for the write
+    assert levels[lcd.pins.rw] == 0
+    # Only the enable pulses are timed, there is no fixed settle time
+    assert usleep.call_args_list == [mocker.call(1)] * usleep.call_count
+    assert msleep.call_count == 0
+
+
+def test_busy_flag_without_rw(charlcd_kwargs):
+    """
+    Without RW pin, the busy flag cannot be read.
+    """
+    charlcd_kwargs['pin_rw'] = None
+    lcd = CharLCD(read_busy_flag=True, **charlcd_kwargs)
+    assert lcd._read_busy_flag is False
+
+
+def test_calibrate_timing(mocker, charlcd_kwargs):
+    """
+    Calibration should measure the execution times with the busy flag.
+    """
+    import RPi.GPIO as GPIO
+
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.cursor_pos = (1, 2)
+    mocker.patch.object(GPIO, 'input', return_value=0)
+    send = mocker.patch.object(lcd, '_send')
+
+    profile = lcd.calibrate_timing(samples=2)
+
+    assert isinstance(profile, common.TimingProfile)
+    assert profile.execution >= 1
+    assert profile.execution_long >= 1
+    assert profile.init_long == lcd.timing.init_long
+    assert send.call_count == 5  # 4 measurements, 1 cursor restore
+    assert lcd.cursor_pos == (1, 2)
+
+
+def test_calibrate_timing_without_rw(charlcd_kwargs):
+    charlcd_kwargs['pin_rw'] = None
+    lcd = CharLCD(**charlcd_kwargs)
+    with pytest.raises(ValueError):
+        lcd.calibrate_timing()
@@ -1,6 +1,9 @@
+import types
+
 import pytest
 
 from RPLCD import codecs
+from RPLCD.gpio import CharLCD
 
 
 @pytest.mark.parametrize(
@@ -57,3 +60,63 @@ def test_encode(input_, result_a00, result_a02, result_st0b):
         input_,
         st0b.encode(input_),
     )
+
+
+@pytest.mark.parametrize('codec', [codecs.A00Codec(), codecs.A02Codec(), codecs.ST0BCodec()])
+def test_encode_fast_path(codec):
+    """
+    Text without newlines or combined characters is translated in one pass,
+    with the same result as encoding it character by character.
+    """
+    input_ = 'Temp: 21°C ♡ Ωμ€ ☃ ~'
+    expected = [codec.codec.encoding_table.get(char, 0x20) for char in input_]
+    assert codec.encode(input_) == expected
+    assert codec.encode(input_ + '\n') == expected + [codecs.LF]
+
+
+def test_encode_longest_match():
+    """
+    Combined mappings of any length are matched, and the longest matching
+    sequence wins.
+    """
+    table = types.SimpleNamespace(
+        replacement_char=0x20,
+        encoding_table={'a': 0x61, 'b': 0x62, 'c': 0x63, 'd': 0x64},
+        combined_chars={'a': [('b', 1), ('bcd', 2)]},
+    )
+    codec = codecs.Codec(table)
+    assert codec.encode('abcd') == [2]
+    assert codec.encode('abcab') == [1, 0x63, 1]
+    assert codec.encode('aab') == [0x61, 1]
+    assert codec.encode('a') == [0x61]
+
+
+def test_encode_cache():
+    codec = codecs.A02Codec(cache_size=2)
+    first = codec.encode('Temp:')
+    assert first == [84, 101, 109, 112, 58]
+    # Changing a result doesn't change the cache
+    first.append(0)
+    assert codec.encode('Temp:') == [84, 101, 109, 112, 58]
+    codec.encode('OK')
+    codec.encode('°C')  # Evicts "Temp:"
+    codec.encode('Temp:')
+    assert codec.cache_info() == codecs.CacheInfo(hits=1, misses=4, maxsize=2, currsize=2)
+
+    codec.cache_clear()
+    assert codec.cache_info() == codecs.CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+    codec.cache_size = 0
+    assert codec.encode('Temp:') == [84, 101, 109, 112, 58]
+    assert codec.cache_info() == codecs.CacheInfo(0, 0, 0, 0)
+    with pytest.raises(ValueError):
+        codec.cache_size = -1
+
+
+def test_write_frame_with_cache(mocker, charlcd_kwargs):
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.codec.cache_size = 8
+    mocker.patch.object(lcd, '_send_data')
+    lcd.write_frame(['ab'])
+    lcd.write_frame(['ab'])
+    assert lcd.codec.cache_info().hits == 1
@@ -16,3 +16,33 @@ from RPLCD import common
 )
 def test_window_function(input_, lookahead, result):
     assert list(common.sliding_window(input_, lookahead)) == result
+
+
+def test_sleep_overshoot():
+    assert common.calibrate() == common.sleep_overshoot()
+    assert common.sleep_overshoot() >= 0
+
+
+@pytest.mark.parametrize('microseconds', [1, 50, 2000])
+def test_usleep(microseconds):
+    start = common.now()
+    common.usleep(microseconds)
+    assert common.now() - start >= microseconds * 1000
+
+
+def test_wait_until_past_deadline():
+    start = common.now()
+    common.wait_until(start - 1000000000)
+    assert common.now() - start < 1000000000
+
+
+def test_calibrate_on_first_wait(mocker):
+    """
+    The sleep overshoot should be measured before the first wait, not on
+    import.
+    """
+    mocker.patch.object(common, '_sleep_overshoot', None)
+    calibrate = mocker.spy(common, 'calibrate')
+    common.usleep(1)
+    common.usleep(1)
+    assert calibrate.call_count == 1
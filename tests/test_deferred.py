@@ -0,0 +1,201 @@
+import pytest
+
+from RPLCD.gpio import CharLCD
+from RPLCD.common import LCD_CLEARDISPLAY, LCD_SETDDRAMADDR
+
+
+SP = 32  # Space
+
+
+def test_frame_defers_writes(mocker, charlcd_kwargs):
+    """
+    Inside a frame, nothing should be sent until the frame is left.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    with lcd.frame():
+        lcd.write_string('hi')
+        lcd.cursor_pos = (1, 0)
+        lcd.write_string('yo')
+        assert send_data.call_count == 0
+        assert send_instruction.call_count == 0
+        assert lcd._content[0][:3] == [104, 105, SP]
+        assert lcd._content[1][:3] == [121, 111, SP]
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    assert data_calls == [(104,), (105,), (121,), (111,)]
+    assert instruction_calls == [
+        (LCD_SETDDRAMADDR | 0x00,),
+        (LCD_SETDDRAMADDR | 0x40,),
+    ]
+    assert lcd.deferred is False
+
+
+def test_flush_only_sends_changes(mocker, charlcd_kwargs):
+    """
+    A flush should only send cells that differ from the display content.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write_string('hello')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    lcd.deferred = True
+    lcd.clear()
+    lcd.write_string('he77o')
+    lcd.flush()
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    # Rewriting the "o" is cheaper than setting the address to the cursor
+    assert data_calls == [(55,), (55,), (111,)]
+    assert instruction_calls == [(LCD_SETDDRAMADDR | 2,)]
+
+    # A second flush without changes should not send anything
+    send_data.reset_mock()
+    send_instruction.reset_mock()
+    lcd.flush()
+    assert send_data.call_count == 0
+    assert send_instruction.call_count == 0
+
+
+def test_clear_in_frame(mocker, charlcd_kwargs):
+    """
+    Clearing inside a frame should overwrite the old cells with blanks instead
+    of sending the clear command.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write_string('ab')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    with lcd.frame():
+        lcd.clear()
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    assert data_calls == [(SP,), (SP,)]
+    assert instruction_calls == [(LCD_SETDDRAMADDR | 0,), (LCD_SETDDRAMADDR | 0,)]
+    assert lcd.cursor_pos == (0, 0)
+
+
+def test_flush_contiguous_rows(mocker, charlcd_kwargs):
+    """
+    On a 20x4 display, row 2 continues row 0 in DDRAM. No address set is
+    needed between the end of row 0 and the start of row 2.
+    """
+    lcd = CharLCD(cols=20, rows=4, **charlcd_kwargs)
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    with lcd.frame():
+        lcd.cursor_pos = (2, 0)
+        lcd.write_string('b')
+        lcd.cursor_pos = (0, 19)
+        lcd.write_string('a')
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    assert data_calls == [(97,), (98,)]
+    assert instruction_calls == [
+        (LCD_SETDDRAMADDR | 19,),
+        (LCD_SETDDRAMADDR | 0x40,),  # Cursor wrapped to the next row
+    ]
+
+
+def test_flush_rewrites_short_gaps(mocker, charlcd_kwargs):
+    """
+    A single unchanged cell between two changed cells is cheaper to rewrite
+    than to skip with an address set.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write_string('abcdef')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    with lcd.frame():
+        lcd.home()
+        send_instruction.reset_mock()
+        lcd.write_string('xbxdex')
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    assert data_calls == [(120,), (98,), (120,), (120,)]
+    assert instruction_calls == [(LCD_SETDDRAMADDR | 0,), (LCD_SETDDRAMADDR | 5,)]
+    # The character by character path needs 1 address set and 6 writes
+    assert lcd.transactions_saved == 7 - 6
+
+
+def test_frame_exception_discards(mocker, charlcd_kwargs):
+    """
+    If a frame raises an exception, nothing should be sent and the content
+    cache should match the display again.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write_string('ab')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    with pytest.raises(RuntimeError):
+        with lcd.frame():
+            lcd.clear()
+            lcd.write_string('xy')
+            raise RuntimeError()
+
+    assert send_data.call_count == 0
+    assert send_instruction.call_count == 0
+    assert lcd.deferred is False
+    assert lcd._content[0][:3] == [97, 98, SP]
+    assert lcd.cursor_pos == (0, 2)
+
+
+def test_write_shift_mode_rejected(charlcd_kwargs):
+    """
+    Rejecting the display write shift mode in deferred mode should not change
+    the mode.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.deferred = True
+    with pytest.raises(ValueError):
+        lcd.write_shift_mode = 'display'
+    assert lcd.write_shift_mode == 'cursor'
+
+
+def test_close_clear_deferred(mocker, charlcd_kwargs):
+    """
+    Closing with ``clear=True`` should clear the display even in deferred
+    mode.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.deferred = True
+    lcd.write_string('ab')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+    mocker.patch.object(lcd, '_close_connection')
+
+    lcd.close(clear=True)
+
+    assert send_data.call_count == 0
+    assert send_instruction.call_args_list == [mocker.call(LCD_CLEARDISPLAY)]
+    assert lcd._content[0][:2] == [SP, SP]
+
+
+def test_write_frame_deferred(mocker, charlcd_kwargs):
+    """
+    In deferred mode, a frame should only be sent on flush.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.deferred = True
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    lcd.write_frame(['yo'])
+    lcd.write_bytes(b'hi' + b' ' * (lcd.lcd.rows * lcd.lcd.cols - 2))
+    assert send_data.call_count == 0
+    assert send_instruction.call_count == 0
+
+    lcd.flush()
+    assert [c[0] for c in send_data.call_args_list] == [(104,), (105,)]
@@ -0,0 +1,65 @@
+from RPLCD import gpio
+from RPLCD.gpio import CharLCD
+
+
+def test_output_skips_unchanged_pins(mocker, charlcd_kwargs):
+    """
+    The data lines should be set with a single call, leaving out the lines
+    that are already at the right level.
+    """
+    import RPi.GPIO as GPIO
+
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write(0x00)  # All data lines low, RS high
+    output = mocker.patch.object(GPIO, 'output')
+
+    lcd.write(0x31)
+    e = charlcd_kwargs['pin_e']
+    assert output.call_args_list == [
+        # High nibble 0x3: D4 and D5 go high
+        mocker.call([21, 22], [1, 1]),
+        mocker.call([e], 1),
+        mocker.call([e], 0),
+        # Low nibble 0x1: D5 goes low again
+        mocker.call([22], [0]),
+        mocker.call([e], 1),
+        mocker.call([e], 0),
+    ]
+
+
+def test_output_rs_change(mocker, charlcd_kwargs):
+    import RPi.GPIO as GPIO
+
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write(0x00)
+    output = mocker.patch.object(GPIO, 'output')
+
+    lcd.command(0x01)
+    assert output.call_args_list[0] == mocker.call([charlcd_kwargs['pin_rs']], [0])
+
+
+def test_pin_config(charlcd_kwargs):
+    """
+    The second enable line is appended, the other fields keep their position.
+    """
+    lcd = CharLCD(cols=40, rows=4, pin_e2=26, **charlcd_kwargs)
+    assert lcd.pins[:3] == (15, 18, 16)
+    assert lcd.pins[7:11] == (21, 22, 23, 24)
+    assert lcd.pins[-1] == 26
+
+
+def test_levels_per_numbering_mode(mocker, charlcd_kwargs):
+    """
+    The shared pin levels are kept per numbering mode, because the same
+    number refers to different pins in BOARD and BCM mode.
+    """
+    import RPi.GPIO as GPIO
+
+    mocker.patch.dict(gpio._levels, clear=True)
+    mocker.patch.dict(gpio._pin_users, clear=True)
+    lcd = CharLCD(**charlcd_kwargs)
+    lcd.write(0x00)
+    assert gpio._levels[GPIO.BOARD, 21] == 0
+    assert (GPIO.BCM, 21) not in gpio._levels
+    lcd.close()
+    assert (GPIO.BOARD, 21) not in gpio._pin_users
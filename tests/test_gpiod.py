@@ -0,0 +1,61 @@
+import pytest
+
+import gpiod
+from gpiod.line import Value
+
+from RPLCD.gpiod import CharLCD
+
+ON = Value.ACTIVE
+OFF = Value.INACTIVE
+
+
+@pytest.fixture
+def lcd():
+    lcd = CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17, 18, 22], cols=16, rows=2)
+    lcd.request.reset_mock()
+    return lcd
+
+
+def test_request_lines():
+    """
+    All lines should be requested at once, with RS and E low.
+    """
+    gpiod.request_lines.reset_mock()
+    CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17, 18, 22], pin_backlight=4)
+    kwargs = gpiod.request_lines.call_args[1]
+    assert list(kwargs['config']) == [(25, 24, 23, 17, 18, 22, 4)]
+    assert kwargs['output_values'][25] is OFF
+    assert kwargs['output_values'][24] is OFF
+    # Active low backlight, enabled
+    assert kwargs['output_values'][4] is OFF
+
+
+def test_send_data(lcd):
+    """
+    Each bus state should be set with a single call, including only the
+    lines that change.
+    """
+    lcd.write(0x00)  # All data lines low, RS high
+    lcd.request.reset_mock()
+    lcd.write(0x41)
+    calls = [call[0][0] for call in lcd.request.set_values.call_args_list]
+    assert calls == [
+        # High nibble 0x4
+        {18: ON},
+        {24: ON},
+        {24: OFF},
+        # Low nibble 0x1
+        {23: ON, 18: OFF},
+        {24: ON},
+        {24: OFF},
+    ]
+
+
+def test_invalid_data_pins():
+    with pytest.raises(ValueError):
+        CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17])
+
+
+def test_close(lcd):
+    lcd.close()
+    lcd.request.release.assert_called_once_with()
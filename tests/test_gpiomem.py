@@ -0,0 +1,76 @@
+import pytest
+
+from RPLCD import gpiomem
+from RPLCD.gpiomem import CharLCD, GPIOMem
+
+
+@pytest.fixture
+def mem(tmp_path):
+    """
+    A plain file instead of /dev/gpiomem.
+    """
+    path = tmp_path / 'gpiomem'
+    path.write_bytes(bytes(4096))
+    mem = GPIOMem(str(path))
+    yield mem
+    mem.close()
+
+
+def test_registers(mem):
+    mem.setup_output(4)
+    mem.setup_output(17)
+    mem.set(0x10)
+    mem.clear(0x20)
+    assert mem.registers[gpiomem.GPFSEL0 // 4] == 0b001 << 12
+    assert mem.registers[gpiomem.GPFSEL0 // 4 + 1] == 0b001 << 21
+    assert mem.registers[gpiomem.GPSET0 // 4] == 0x10
+    assert mem.registers[gpiomem.GPCLR0 // 4] == 0x20
+
+
+def test_send_data(mocker, mem):
+    """
+    The data lines and RS should be set with one store per register and
+    nibble.
+    """
+    lcd = CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17, 18, 22], gpiomem=mem)
+    for pin in (25, 24, 23, 17, 18, 22):
+        fsel = mem.registers[pin // 10]
+        assert (fsel >> (pin % 10) * 3) & 0b111 == 0b001
+
+    set_ = mocker.spy(mem, 'set')
+    clear = mocker.spy(mem, 'clear')
+    lcd.write(0x41)
+    rs, e = 1 << 25, 1 << 24
+    assert [call[0][0] for call in set_.call_args_list] == [
+        (1 << 18) | rs,
+        e,
+        (1 << 23) | rs,
+        e,
+    ]
+    assert [call[0][0] for call in clear.call_args_list] == [
+        (1 << 23) | (1 << 17) | (1 << 22),
+        e,
+        (1 << 17) | (1 << 18) | (1 << 22),
+        e,
+    ]
+
+
+def test_invalid_pin(mem):
+    with pytest.raises(ValueError):
+        CharLCD(pin_rs=25, pin_e=40, pins_data=[23, 17, 18, 22], gpiomem=mem)
+
+
+def test_close(mocker, mem):
+    """
+    Registers passed in by the caller should stay open, registers mapped by
+    the LCD should be closed with it.
+    """
+    lcd = CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17, 18, 22], gpiomem=mem)
+    close = mocker.spy(mem, 'close')
+    lcd.close()
+    assert close.call_count == 0
+
+    created = mocker.patch.object(gpiomem, 'GPIOMem').return_value
+    lcd = CharLCD(pin_rs=25, pin_e=24, pins_data=[23, 17, 18, 22])
+    lcd.close()
+    assert created.close.call_count == 1
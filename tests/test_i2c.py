@@ -0,0 +1,171 @@
+from unittest import mock
+
+import pytest
+
+from RPLCD.i2c import CharLCD
+from RPLCD.common import LCD_SETDDRAMADDR
+
+
+@pytest.fixture(autouse=True)
+def smbus(mocker):
+    """
+    Give every test its own bus, and use the block writes of the smbus
+    module, even if smbus2 is installed.
+    """
+    mocker.patch.dict('RPLCD.i2c._buses', clear=True)
+    mocker.patch('RPLCD.i2c.SMBus', side_effect=lambda port: mock.MagicMock())
+    mocker.patch('RPLCD.i2c.i2c_msg', None)
+
+
+@pytest.fixture
+def pcf8574():
+    lcd = CharLCD('PCF8574', 0x27, cols=16, rows=2)
+    lcd.bus.reset_mock()
+    return lcd
+
+
+def test_pcf8574_send_data(pcf8574):
+    """
+    A data byte should be written as six expander states in one transaction.
+    """
+    pcf8574.write(0x41)
+    pcf8574.bus.write_i2c_block_data.assert_called_once_with(
+        0x27, 0x49, [0x4D, 0x49, 0x19, 0x1D, 0x19]
+    )
+    assert pcf8574.bus.write_byte.call_count == 0
+
+
+def test_pcf8574_i2c_rdwr(mocker, pcf8574):
+    """
+    With smbus2, all states should be sent as a single I2C message.
+    """
+    i2c_msg = mocker.patch('RPLCD.i2c.i2c_msg')
+    pcf8574.write(0x41)
+    i2c_msg.write.assert_called_once_with(0x27, bytes([0x49, 0x4D, 0x49, 0x19, 0x1D, 0x19]))
+    pcf8574.bus.i2c_rdwr.assert_called_once_with(i2c_msg.write.return_value)
+    assert pcf8574.bus.write_i2c_block_data.call_count == 0
+
+
+def test_pcf8574_send_instruction(pcf8574):
+    pcf8574.backlight_enabled = False
+    pcf8574.bus.reset_mock()
+    pcf8574.command(LCD_SETDDRAMADDR | 0x40)
+    pcf8574.bus.write_i2c_block_data.assert_called_once_with(
+        0x27, 0xC0, [0xC4, 0xC0, 0x00, 0x04, 0x00]
+    )
+
+
+def test_pcf8574_data_run(pcf8574):
+    """
+    Consecutive cells should be flushed in a single transaction.
+    """
+    with pcf8574.frame():
+        pcf8574.write_string('abc')
+    calls = pcf8574.bus.write_i2c_block_data.call_args_list
+    # Set address, write the run, no need to move the cursor afterwards
+    assert len(calls) == 2
+    assert calls[0][0][1] == 0x88
+    assert len(calls[1][0][2]) == 3 * 6 - 1
+
+
+def test_mcp23008_init():
+    """
+    The address pointer increment should be disabled.
+    """
+    lcd = CharLCD('MCP23008', 0x20, cols=16, rows=2)
+    assert lcd.bus.write_byte_data.call_args_list[:2] == [
+        mock.call(0x20, 0x00, 0x00),  # IODIR
+        mock.call(0x20, 0x05, 0x20),  # IOCON.SEQOP
+    ]
+
+
+def test_mcp23008_send_data():
+    """
+    A data byte should be streamed to the GPIO register in one transaction.
+    """
+    lcd = CharLCD('MCP23008', 0x20, cols=16, rows=2)
+    lcd.bus.reset_mock()
+    lcd.write(0x41)
+    lcd.bus.write_i2c_block_data.assert_called_once_with(
+        0x20, 0x09, [0xA2, 0xA6, 0xA2, 0x8A, 0x8E, 0x8A]
+    )
+    assert lcd.bus.write_byte_data.call_count == 0
+
+
+@pytest.mark.parametrize(['bank', 'iodir', 'gpio'], [('A', 0x00, 0x12), ('B', 0x01, 0x13)])
+def test_mcp23017_registers(bank, iodir, gpio):
+    """
+    On the MCP23017, IOCON should not be touched, because it is shared by
+    both banks. Every state is written to the GPIO register of the bank.
+    """
+    lcd = CharLCD('MCP23017', 0x20, expander_params={'gpio_bank': bank}, cols=16, rows=2)
+    assert lcd.bus.write_byte_data.call_args_list[0] == mock.call(0x20, iodir, 0x00)
+    registers = {call[0][1] for call in lcd.bus.write_byte_data.call_args_list[1:]}
+    assert registers == {gpio}
+
+    lcd.bus.reset_mock()
+    lcd.write(0x41)
+    assert lcd.bus.write_byte_data.call_args_list == [
+        mock.call(0x20, gpio, state) for state in [0xA2, 0xA6, 0xA2, 0x8A, 0x8E, 0x8A]
+    ]
+    assert lcd.bus.write_i2c_block_data.call_count == 0
+
+
+def test_shared_bus(mocker):
+    """
+    Displays on the same port should share one SMBus handle, which is closed
+    when the last display is closed.
+    """
+    smbus = mocker.patch('RPLCD.i2c.SMBus', side_effect=lambda port: mock.MagicMock())
+    mocker.patch.dict('RPLCD.i2c._buses', clear=True)
+    lcd1 = CharLCD('PCF8574', 0x27, cols=16, rows=2)
+    lcd2 = CharLCD('PCF8574', 0x26, cols=16, rows=2)
+    other = CharLCD('PCF8574', 0x27, port=0, cols=16, rows=2)
+    assert smbus.call_args_list == [mock.call(1), mock.call(0)]
+    assert lcd1.bus is lcd2.bus
+    assert lcd1._bus_lock is lcd2._bus_lock
+    assert other.bus is not lcd1.bus
+
+    bus = lcd1.bus
+    lcd1.close()
+    lcd1.close()
+    assert bus.close.call_count == 0
+    lcd2.close()
+    assert bus.close.call_count == 1
+
+
+def test_flush_holds_bus(mocker, pcf8574):
+    """
+    A flush should hold the bus lock for the whole frame.
+    """
+    lock = mocker.MagicMock()
+    pcf8574._bus_lock = lock
+    with pcf8574.frame():
+        pcf8574.write_string('ab')
+        pcf8574.cursor_pos = (1, 0)
+        pcf8574.write_string('cd')
+    # The outermost acquisition is the flush, all writes are nested
+    calls = [name for name, _, _ in lock.mock_calls]
+    assert calls == ['__enter__'] + ['__enter__', '__exit__'] * 4 + ['__exit__']
+
+
+def test_bus_speed_costs():
+    lcd = CharLCD('PCF8574', 0x27, cols=16, rows=2, bus_speed=400000)
+    assert lcd._instruction_cost == pytest.approx(7 * 22.5)
+    assert lcd._data_cost == pytest.approx(6 * 22.5)
+    with pytest.raises(ValueError):
+        CharLCD('PCF8574', 0x27, cols=16, rows=2, bus_speed=0)
+
+
+@pytest.mark.parametrize(['bus_speed', 'padding'], [(100000, 0), (400000, 1), (1000000, 4)])
+def test_bus_speed_padding(bus_speed, padding):
+    """
+    On a fast bus, idle states are inserted between the bytes of a run, so
+    that the LCD has time to execute each byte.
+    """
+    lcd = CharLCD('PCF8574', 0x27, cols=16, rows=2, bus_speed=bus_speed)
+    lcd.bus.reset_mock()
+    lcd._send_data_run([0x41, 0x42])
+    data = lcd.bus.write_i2c_block_data.call_args[0]
+    assert len(data[2]) == 2 * 6 + padding - 1
+    assert data[2][5 : 5 + padding] == [0x19] * padding
@@ -0,0 +1,81 @@
+import ctypes
+
+import pytest
+
+from RPLCD import i2c_dev
+from RPLCD.i2c import CharLCD
+from RPLCD.i2c_native import CharLCD as NativeCharLCD
+
+
+@pytest.fixture
+def transfers(mocker):
+    """
+    Fake /dev/i2c device. Returns the list of transactions written with the
+    I2C_RDWR ioctl, as (address, data) tuples.
+    """
+    transfers = []
+
+    def ioctl(fd, request, arg):
+        assert fd == 42
+        assert request == i2c_dev.I2C_RDWR
+        assert arg.nmsgs == 1
+        msg = arg.msgs[0]
+        assert msg.flags == 0
+        transfers.append((msg.addr, bytes(msg.buf[: msg.len])))
+
+    mocker.patch.dict('RPLCD.i2c._buses', clear=True)
+    mocker.patch.object(i2c_dev.os, 'open', return_value=42)
+    mocker.patch.object(i2c_dev.os, 'close')
+    mocker.patch.object(i2c_dev.fcntl, 'ioctl', side_effect=ioctl)
+    return transfers
+
+
+def test_write(transfers):
+    bus = i2c_dev.I2CDev(1, buffer_size=4)
+    i2c_dev.os.open.assert_called_once_with('/dev/i2c-1', i2c_dev.os.O_RDWR)
+    bus.write(0x27, [1, 2, 3])
+    bus.write_byte_data(0x20, 0x09, 0xFF)
+    # Longer than the buffer
+    bus.write_i2c_block_data(0x27, 0, range(1, 10))
+    assert transfers == [
+        (0x27, b'\x01\x02\x03'),
+        (0x20, b'\x09\xff'),
+        (0x27, bytes(range(10))),
+    ]
+    assert ctypes.sizeof(bus._buffer) == 10
+    bus.close()
+    i2c_dev.os.close.assert_called_once_with(42)
+
+
+def test_charlcd(transfers):
+    """
+    Every byte, and every run of bytes in a flush, should be written in a
+    single system call.
+    """
+    lcd = CharLCD('PCF8574', 0x27, cols=16, rows=2, transport='i2c-dev')
+    del transfers[:]
+    with lcd.frame():
+        lcd.write_string('abc')
+    assert len(transfers) == 2
+    # Set DDRAM address 0, with the backlight on
+    assert transfers[0] == (0x27, bytes([0x88, 0x8C, 0x88, 0x08, 0x0C, 0x08]))
+    assert len(transfers[1][1]) == 3 * 6
+    lcd.close()
+    i2c_dev.os.close.assert_called_once_with(42)
+
+
+def test_native_charlcd(transfers):
+    """
+    A run of data bytes should be written in a single system call, even if
+    it is longer than an SMBus block.
+    """
+    lcd = NativeCharLCD('ST7032', cols=40, rows=2, transport='i2c-dev')
+    del transfers[:]
+    lcd._send_data_run(list(b'a' * 40))
+    assert transfers == [(0x3E, bytes([0x40]) + b'a' * 40)]
+    lcd.close()
+
+
+def test_invalid_transport():
+    with pytest.raises(ValueError):
+        CharLCD('PCF8574', 0x27, transport='spi')
@@ -0,0 +1,94 @@
+from unittest import mock
+
+import pytest
+
+from RPLCD.i2c_native import CharLCD
+
+
+@pytest.fixture(autouse=True)
+def smbus(mocker):
+    """
+    Give every test its own bus, and use the block writes of the smbus
+    module, even if smbus2 is installed.
+    """
+    mocker.patch.dict('RPLCD.i2c._buses', clear=True)
+    mocker.patch('RPLCD.i2c.SMBus', side_effect=lambda port: mock.MagicMock())
+    mocker.patch('RPLCD.i2c_native.i2c_msg', None)
+
+
+@pytest.fixture
+def st7032():
+    lcd = CharLCD('ST7032')
+    lcd.bus.reset_mock()
+    return lcd
+
+
+def test_st7032_init():
+    """
+    The ST7032 needs the extended instruction set for powering up.
+    """
+    lcd = CharLCD('ST7032', contrast=0.5)
+    assert lcd.bus.write_i2c_block_data.call_args_list[0][0] == (
+        0x3E,
+        0x00,
+        [0x38, 0x39, 0x14, 0x70, 0x5E, 0x6C],
+    )
+
+
+def test_send_data(st7032):
+    st7032.write(0x41)
+    st7032.bus.write_byte_data.assert_called_once_with(0x3E, 0x40, 0x41)
+
+
+def test_flush_streams_data(st7032):
+    """
+    A whole row should be written in a single transaction.
+    """
+    st7032.write_frame(['Hello', 'World'])
+    bus = st7032.bus
+    assert bus.write_i2c_block_data.call_args_list == [
+        ((0x3E, 0x40, list(b'Hello')),),
+        ((0x3E, 0x40, list(b'World')),),
+    ]
+    # Address sets for both rows and restoring the cursor
+    assert bus.write_byte_data.call_args_list == [
+        ((0x3E, 0x00, 0x80 | 0x00),),
+        ((0x3E, 0x00, 0x80 | 0x40),),
+        ((0x3E, 0x00, 0x80 | 0x00),),
+    ]
+
+
+def test_contrast(st7032):
+    st7032.contrast = 1
+    st7032.bus.write_i2c_block_data.assert_called_once_with(0x3E, 0x00, [0x39, 0x7F, 0x5F, 0x38])
+
+
+def test_contrast_holds_bus(mocker, st7032):
+    """
+    Setting the contrast outside of a flush should hold the bus lock.
+    """
+    lock = mocker.MagicMock()
+    st7032._bus_lock = lock
+    st7032.contrast = 1
+    calls = [name for name, _, _ in lock.mock_calls]
+    assert calls == ['__enter__', '__exit__']
+
+
+def test_contrast_unsupported():
+    lcd = CharLCD('AiP31068')
+    with pytest.raises(ValueError):
+        lcd.contrast = 0.5
+
+
+def test_fast_bus_no_streaming():
+    """
+    If the bus is faster than the LCD, data bytes are sent one by one.
+    """
+    lcd = CharLCD('AiP31068', bus_speed=1000000)
+    lcd.bus.reset_mock()
+    lcd._send_data_run([0x41, 0x42])
+    assert lcd.bus.write_i2c_block_data.call_count == 0
+    assert lcd.bus.write_byte_data.call_args_list == [
+        ((0x3E, 0x40, 0x41),),
+        ((0x3E, 0x40, 0x42),),
+    ]
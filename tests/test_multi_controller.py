@@ -0,0 +1,114 @@
+import pytest
+
+from RPLCD.gpio import CharLCD
+from RPLCD.common import LCD_SETDDRAMADDR, RS_DATA, RS_INSTRUCTION
+
+
+@pytest.fixture
+def lcd(charlcd_kwargs):
+    """
+    A 40x4 display with two controllers.
+    """
+    return CharLCD(cols=40, rows=4, pin_e2=26, **charlcd_kwargs)
+
+
+@pytest.fixture
+def sent(mocker, lcd):
+    """
+    Record every transfer as a ``(enable_mask, mode, value)`` tuple.
+    """
+    sent = []
+    mocker.patch.object(
+        lcd,
+        '_send_instruction',
+        side_effect=lambda value: sent.append((lcd._enable_mask, RS_INSTRUCTION, value)),
+    )
+    mocker.patch.object(
+        lcd,
+        '_send_data',
+        side_effect=lambda value: sent.append((lcd._enable_mask, RS_DATA, value)),
+    )
+    return sent
+
+
+def test_write_lower_half(lcd, sent):
+    """
+    The lower two rows are driven by the second controller, starting at DDRAM
+    address 0.
+    """
+    lcd.cursor_pos = (3, 2)
+    lcd.write_string('a')
+    assert sent == [
+        (0b10, RS_INSTRUCTION, LCD_SETDDRAMADDR | 0x42),
+        (0b10, RS_DATA, 97),
+    ]
+
+
+def test_commands_broadcast(lcd, sent):
+    lcd.clear()
+    assert sent == [(0b11, RS_INSTRUCTION, 0x01)]
+
+
+def test_flush_only_changed_controller(lcd, sent):
+    with lcd.frame():
+        lcd.cursor_pos = (2, 0)
+        lcd.write_string('x')
+        lcd.home()
+    assert sent == [
+        (0b11, RS_INSTRUCTION, 0x02),  # Home
+        (0b10, RS_INSTRUCTION, LCD_SETDDRAMADDR | 0x00),
+        (0b10, RS_DATA, 120),
+    ]
+
+
+def test_flush_identical_changes(lcd, sent):
+    """
+    If both controllers get the same changes, the data is put on the bus
+    once and both controllers are strobed.
+    """
+    lcd.write_frame(['ab', '', 'ab', ''])
+    assert sent == [
+        (0b11, RS_INSTRUCTION, LCD_SETDDRAMADDR | 0x00),
+        (0b11, RS_DATA, 97),
+        (0b11, RS_DATA, 98),
+        # Restore the cursor position on the first controller
+        (0b01, RS_INSTRUCTION, LCD_SETDDRAMADDR | 0x00),
+    ]
+
+
+def test_cursor_follows_controller(lcd, sent):
+    """
+    Only the controller with the cursor should show it.
+    """
+    lcd.cursor_mode = 'blink'
+    del sent[:]
+    lcd.cursor_pos = (2, 0)
+    assert sent == [
+        (0b10, RS_INSTRUCTION, LCD_SETDDRAMADDR | 0x00),
+        (0b01, RS_INSTRUCTION, 0x0C),
+        (0b10, RS_INSTRUCTION, 0x0D),
+    ]
+
+
+def test_enable_pulse(mocker, lcd):
+    import RPi.GPIO as GPIO
+
+    output = mocker.patch.object(GPIO, 'output')
+    lcd.command(0x01)
+    assert mocker.call([16, 26], 1) in output.call_args_list
+
+
+def test_rows_not_divisible(charlcd_kwargs):
+    with pytest.raises(ValueError):
+        CharLCD(cols=40, rows=3, pin_e2=26, **charlcd_kwargs)
+
+
+def test_calibrate_timing_rejected(mocker, lcd):
+    """
+    The busy flag is only read from the first controller, so calibrating is
+    not supported with two controllers.
+    """
+    send = mocker.patch.object(lcd, '_send')
+    with pytest.raises(ValueError):
+        lcd.calibrate_timing()
+    assert send.call_count == 0
@@ -0,0 +1,311 @@
+from collections import namedtuple
+from unittest import mock
+
+import pytest
+
+from RPLCD.pigpio import CharLCD, pigpio
+
+Pulse = namedtuple('Pulse', 'gpio_on gpio_off delay')
+
+
+@pytest.fixture
+def pi(mocker):
+    mocker.patch.dict('RPLCD.pigpio._connections', clear=True)
+    mocker.patch.dict('RPLCD.pigpio._scripts', clear=True)
+    pi = mocker.MagicMock()
+    pi.run_script.return_value = 0
+    pi.script_status.return_value = (pigpio.PI_SCRIPT_HALTED, [])
+    pi.wave_tx_busy.return_value = 0
+    return pi
+
+
+@pytest.fixture
+def pulse(mocker):
+    return mocker.patch('RPLCD.pigpio.pigpio.pulse', side_effect=Pulse)
+
+
+def test_send_run_as_wave(mocker, pi, pulse):
+    """
+    With waves enabled, a run of bytes is sent as one waveform.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], use_waves=True)
+    pi.run_script.reset_mock()
+
+    lcd.write_frame(['ab'])
+
+    # Script runs for setting the address and restoring the cursor position,
+    # one wave for the data
+    assert pi.run_script.call_count == 2
+    pi.wave_send_once.assert_called_once_with(pi.wave_create.return_value)
+    pulses = pi.wave_add_generic.call_args[0][0]
+    assert len(pulses) == 2 * 2 * 3
+    rs, e = 1 << 15, 1 << 16
+    d4, d5, d6 = 1 << 21, 1 << 22, 1 << 23
+    # High nibble of "a" (0x6)
+    assert pulses[0].gpio_on == rs | d5 | d6
+    assert pulses[1] == Pulse(e, 0, 1)
+    assert pulses[2] == Pulse(0, e, 1)
+    # Low nibble of "a" (0x1), followed by the execution time
+    assert pulses[3].gpio_on == rs | d4
+    assert pulses[5] == Pulse(0, e, lcd.timing.execution)
+
+    # The wave is deleted before the next one is created
+    lcd.write_frame(['cd'])
+    pi.wave_delete.assert_called_once_with(pi.wave_create.return_value)
+
+
+def test_wave_construction(mocker, pi, pulse):
+    """
+    Waveforms are built from scratch, holding a lock shared by all displays
+    on the same connection.
+    """
+    lcd1 = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], use_waves=True)
+    lcd2 = CharLCD(pi, pin_rs=15, pin_e=17, pins_data=[21, 22, 23, 24], use_waves=True)
+    assert lcd1._wave_lock is lcd2._wave_lock
+    other = mocker.MagicMock()
+    other.script_status.return_value = pi.script_status.return_value
+    other.wave_tx_busy.return_value = 0
+    lcd3 = CharLCD(other, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], use_waves=True)
+    assert lcd3._wave_lock is not lcd1._wave_lock
+
+    # Another wave on the connection is still being transmitted
+    pi.reset_mock()
+    pi.wave_tx_busy.side_effect = [1, 1, 0]
+    lcd1.write_frame(['ab'])
+    calls = [name for name, _, _ in pi.mock_calls if name.startswith('wave_')]
+    assert calls == [
+        'wave_tx_busy',
+        'wave_tx_busy',
+        'wave_tx_busy',
+        'wave_add_new',
+        'wave_add_generic',
+        'wave_create',
+        'wave_send_once',
+    ]
+
+
+def test_no_waves(pi, pulse):
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24])
+    pi.run_script.reset_mock()
+    lcd.write_frame(['ab'])
+    # Setting the address, one run for both bytes, restoring the cursor
+    assert pi.run_script.call_count == 3
+    assert pi.wave_send_once.call_count == 0
+
+
+def test_send_bank_masks(pi):
+    """
+    The write script updates RS, RW and the data lines with bank operations,
+    using precomputed masks per byte.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_rw=18, pin_e=16, pins_data=[21, 22, 23, 24])
+    script = pi.store_script.call_args[0][0].decode()
+    assert 'write' not in script
+    # Two bytes per run with two chunks each, and an enable pulse per chunk
+    assert script.count('bs1') == 8
+    assert script.count('bc1') == 8
+    pi.run_script.reset_mock()
+
+    lcd.write_string('a')
+
+    rs, rw, e = 1 << 15, 1 << 18, 1 << 16
+    d4, d5, d6, d7 = 1 << 21, 1 << 22, 1 << 23, 1 << 24
+    params = pi.run_script.call_args[0][1]
+    assert params == [
+        e,
+        rs | d5 | d6,  # High nibble of "a" (0x6)
+        rw | d4 | d7,
+        rs | d4,  # Low nibble of "a" (0x1)
+        rw | d5 | d6 | d7,
+        0,  # No second byte
+        0,
+        0,
+        0,
+    ]
+
+
+def test_busy_flag_script(pi):
+    """
+    With the busy flag, the write script polls it before every byte, and
+    gives up after 1000 polls.
+    """
+    lcd = CharLCD(
+        pi, pin_rs=15, pin_rw=18, pin_e=16, pins_data=[21, 22, 23, 24], read_busy_flag=True
+    )
+    script = pi.store_script.call_args[0][0].decode()
+    read_nibble = 'write 16 1 mics 1 read 24 sta v0 write 16 0 mics 1 '
+    clock_nibble = 'write 16 1 mics 1 write 16 0 mics 1 '
+    write_nibble = 'bs1 p{} bc1 p{} mics 1 bs1 p0 mics 1 bc1 p0'
+    assert script == (
+        'modes 21 r modes 22 r modes 23 r modes 24 r '
+        'write 15 0 write 18 1 ld v1 1000 tag 900 '
+        + read_nibble
+        + clock_nibble
+        + 'lda v0 jz 901 mics 10 dcr v1 lda v1 jnz 900 tag 901 write 18 0 '
+        'modes 21 w modes 22 w modes 23 w modes 24 w '
+        + write_nibble.format(1, 2)
+        + ' '
+        + write_nibble.format(3, 4)
+    )
+    assert lcd._run_length == 1
+
+    # One script run per byte
+    pi.run_script.reset_mock()
+    lcd.write_frame(['ab'])
+    params = [call[0][1] for call in pi.run_script.call_args_list]
+    assert len(params) == 4  # Address, "a", "b", restoring the cursor
+    assert all(p[5:] == [0] * 4 for p in params)
+
+
+def test_pin_out_of_bank(pi):
+    with pytest.raises(ValueError):
+        CharLCD(pi, pin_rs=40, pin_e=16, pins_data=[21, 22, 23, 24])
+
+
+def test_script_runs_wait_for_completion(mocker, pi):
+    """
+    A run of bytes is split into runs of the write script, and each of them
+    is only submitted once pigpiod reports the previous one as done.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24])
+    pi.run_script.reset_mock()
+    pi.script_status.reset_mock()
+    running = (pigpio.PI_SCRIPT_RUNNING, [])
+    halted = (pigpio.PI_SCRIPT_HALTED, [])
+    pi.script_status.side_effect = [running, halted, running, running, halted]
+    exceptions = pigpio.exceptions
+
+    lcd._send_data_run([97, 98, 99])
+
+    params = [call[0][1] for call in pi.run_script.call_args_list]
+    assert len(params) == 2
+    assert params[0][1:3] == list(lcd._byte_params[1][97][:2])
+    assert params[1][1:] == lcd._byte_params[1][99] + [0, 0, 0, 0]
+    assert pi.script_status.call_count == 5
+    assert pigpio.exceptions is exceptions
+
+
+def test_shared_connection(mocker, pi):
+    """
+    Displays without a pigpio.pi share one connection and identical stored
+    scripts, which are cleaned up by the last of them.
+    """
+    connect = mocker.patch('RPLCD.pigpio.pigpio.pi', return_value=pi)
+    lcd1 = CharLCD(pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24])
+    lcd2 = CharLCD(pin_rs=17, pin_e=18, pins_data=[5, 6, 12, 13])
+    assert connect.call_count == 1
+    assert lcd1.pi is lcd2.pi is pi
+    assert pi.store_script.call_count == 1
+    assert lcd1._script is lcd2._script
+
+    lcd1.close()
+    assert pi.delete_script.call_count == 0
+    assert pi.stop.call_count == 0
+
+    lcd2.close()
+    pi.delete_script.assert_called_once_with(pi.store_script.return_value)
+    pi.stop.assert_called_once_with()
+
+
+def test_own_connection_not_stopped(pi):
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24])
+    lcd.close()
+    assert pi.delete_script.call_count == 1
+    assert pi.stop.call_count == 0
+
+
+def test_fade_backlight(pi):
+    """
+    A fade is stored as a pigpio script that follows the perceptual curve,
+    and setting the backlight stops it.
+    """
+    lcd = CharLCD(
+        pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], pin_backlight=4, backlight_pwm=True
+    )
+    pi.store_script.reset_mock()
+    pi.set_PWM_dutycycle.reset_mock()
+
+    lcd.fade_backlight(0, 0.5)
+
+    script = pi.store_script.call_args[0][0].decode().split()
+    # 50 steps of 10 ms, but only the ones that change the duty cycle
+    assert script[:5] == ['mils', '10', 'pwm', '4', '27']
+    assert script[-3:] == ['pwm', '4', '255']  # Active low
+    # The last steps round to the same duty cycle
+    assert 450 < sum(int(script[i + 1]) for i in range(0, len(script), 5)) < 500
+    pi.run_script.assert_called_with(pi.store_script.return_value, [])
+    assert pi.set_PWM_dutycycle.call_count == 0
+    assert lcd.backlight_enabled == 0
+
+    lcd.backlight_enabled = 1
+    pi.stop_script.assert_called_once_with(pi.store_script.return_value)
+    pi.delete_script.assert_called_once_with(pi.store_script.return_value)
+
+
+def test_ramp_contrast(pi):
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], pin_contrast=17)
+    pi.store_script.reset_mock()
+    lcd.ramp_contrast(1, 0.05)
+    script = pi.store_script.call_args[0][0].decode()
+    assert script == 'mils 10 pwm 17 153 mils 10 pwm 17 178 mils 10 pwm 17 204 ' + (
+        'mils 10 pwm 17 230 mils 10 pwm 17 255'
+    )
+    assert lcd.contrast == 1
+    with pytest.raises(ValueError):
+        lcd.ramp_contrast(0, -1)
+    assert lcd.contrast == 1
+
+
+def test_interrupted_ramp(pi):
+    """
+    A ramp that interrupts another one starts at the level reached so far,
+    not at the end level of the interrupted ramp.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], pin_contrast=17)
+    lcd.contrast = 0
+    lcd.ramp_contrast(1, 1)
+    # Pretend that half of the ramp is over
+    start, end, started, duration = lcd._ramp_levels[17]
+    lcd._ramp_levels[17] = (start, end, started - 500000000, duration)
+
+    pi.store_script.reset_mock()
+    lcd.ramp_contrast(0, 0.05)
+    pi.stop_script.assert_called_once_with(pi.store_script.return_value)
+    script = pi.store_script.call_args[0][0].decode().split()
+    # The first of five steps goes from 0.5 to 0.4, not from 1 to 0.8
+    assert 95 <= int(script[4]) <= 110
+    assert script[-1] == '0'
+
+
+def test_ramp_without_duration(pi):
+    """
+    Ramps too short for a single step set the duty cycle directly.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], pin_contrast=17)
+    pi.store_script.reset_mock()
+    lcd.ramp_contrast(1, 0)
+    lcd.ramp_contrast(0, 0.004)
+    assert pi.store_script.call_count == 0
+    assert pi.set_PWM_dutycycle.call_args_list[-2:] == [
+        mock.call(17, 255),
+        mock.call(17, 0),
+    ]
+
+
+def test_close_stops_ramps(pi):
+    """
+    Closing stops running ramps instead of waiting for them.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_e=16, pins_data=[21, 22, 23, 24], pin_contrast=17)
+    lcd.ramp_contrast(1, 1)
+    lcd.close()
+    pi.stop_script.assert_called_once_with(pi.store_script.return_value)
+
+
+def test_calibrate_timing_rejected(pi):
+    """
+    The pigpio backend cannot measure execution times.
+    """
+    lcd = CharLCD(pi, pin_rs=15, pin_rw=18, pin_e=16, pins_data=[21, 22, 23, 24])
+    with pytest.raises(ValueError):
+        lcd.calibrate_timing()
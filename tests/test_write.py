@@ -1,6 +1,8 @@
 import pytest
 
 from RPLCD.gpio import CharLCD
+from RPLCD.lcd import BaseCharLCD
+from RPLCD import common
 from RPLCD.common import LCD_SETDDRAMADDR
 
 
@@ -114,3 +116,118 @@ def test_write_newline(mocker, rows, cols, charlcd_kwargs):
         assert instruction_calls[2] == (0x80 + cols + 0,), instruction_calls
     assert data_calls[2] == (99,), data_calls
     assert data_calls[3] == (100,), data_calls
+
+
+def test_write_frame(mocker, charlcd_kwargs):
+    """
+    Writing a frame should only send the changed cells.
+    """
+    lcd = CharLCD(cols=16, rows=2, **charlcd_kwargs)
+    lcd.write_string('Temp: 20')
+    send_data = mocker.patch.object(lcd, '_send_data')
+    send_instruction = mocker.patch.object(lcd, '_send_instruction')
+
+    lcd.write_frame(['Temp: 21', 'OK'])
+
+    assert lcd._content[0] == list(b'Temp: 21        ')
+    assert lcd._content[1] == list(b'OK              ')
+    data_calls = [c[0] for c in send_data.call_args_list]
+    instruction_calls = [c[0] for c in send_instruction.call_args_list]
+    assert data_calls == [(49,), (79,), (75,)]
+    assert instruction_calls == [
+        (LCD_SETDDRAMADDR | 7,),
+        (LCD_SETDDRAMADDR | 0x40,),
+        (LCD_SETDDRAMADDR | 8,),  # Restore cursor position
+    ]
+
+
+def test_write_bytes(mocker, charlcd_kwargs):
+    """
+    An encoded buffer should be written as is.
+    """
+    lcd = CharLCD(cols=16, rows=2, **charlcd_kwargs)
+    send_data = mocker.patch.object(lcd, '_send_data')
+
+    lcd.write_bytes(b'a' + b' ' * 15 + b' ' * 15 + b'\xdf')
+
+    data_calls = [c[0] for c in send_data.call_args_list]
+    assert data_calls == [(97,), (0xDF,)]
+    assert lcd.cursor_pos == (0, 0)
+
+
+@pytest.mark.parametrize(
+    'rows',
+    [
+        ['a', 'b', 'c'],
+        ['a' * 17],
+        ['a\nb'],
+        'ab',
+    ],
+)
+def test_write_frame_invalid(rows, charlcd_kwargs):
+    lcd = CharLCD(cols=16, rows=2, **charlcd_kwargs)
+    with pytest.raises(ValueError):
+        lcd.write_frame(rows)
+
+
+def test_clear_deadline(mocker, charlcd_kwargs):
+    """
+    Clearing the display should not block, but the next write has to wait
+    until the controller is done.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    settle = mocker.spy(lcd, '_settle')
+    wait_until = mocker.patch.object(common, 'wait_until')
+
+    lcd.clear()
+    assert settle.call_args == mocker.call(2000)  # Execution time of clear
+    deadline = lcd._ready_at
+
+    wait_until.reset_mock()
+    lcd.write_string('a')
+    assert wait_until.call_args_list[0] == mocker.call(deadline)
+
+
+def test_deadline_nanoseconds(charlcd_kwargs):
+    """
+    Deadlines are kept in nanoseconds of the monotonic clock.
+    """
+    lcd = CharLCD(**charlcd_kwargs)
+    before = common.now()
+    lcd.clear()
+    assert isinstance(lcd._ready_at, int)
+    assert lcd._ready_at >= before + 2000 * 1000
+
+
+def test_legacy_backend_deadlines(mocker):
+    """
+    Backends that don't keep the execution deadlines themselves should still
+    wait for the controller after clearing the display.
+    """
+    sent = []
+
+    class LegacyCharLCD(BaseCharLCD):
+        data_bus_mode = common.LCD_8BITMODE
+
+        def _init_connection(self):
+            pass
+
+        def _close_connection(self):
+            pass
+
+        def _send_instruction(self, value):
+            sent.append(value)
+
+        def _send_data(self, value):
+            sent.append(value)
+
+    lcd = LegacyCharLCD(cols=16, rows=2)
+    mocker.patch.object(common, 'wait_until', side_effect=sent.append)
+    del sent[:]
+
+    before = common.now()
+    lcd.clear()
+    deadline = lcd._ready_at
+    assert deadline >= before + 2000 * 1000
+    lcd.write_string('a')
+    assert sent == [mocker.ANY, common.LCD_CLEARDISPLAY, deadline, 97]